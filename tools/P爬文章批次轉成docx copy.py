@@ -2,6 +2,7 @@ import os
 import re
 import csv
 import sys
+import asyncio
 import traceback
 from datetime import datetime
 from urllib.parse import urlparse
@@ -10,11 +11,23 @@ from email.utils import parsedate_to_datetime
 from docx import Document
 from docx.shared import Pt
 
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
+from playwright.async_api import async_playwright, TimeoutError as PWTimeoutError
+
+import pw_pool
+from output_claim import begin_claim_round, claim_output, settle_output
 
 CSV_PATH = r"F:\F\AI\web\web.csv"
 OUT_DIR  = r"F:\F\AI\web"
 NAV_TIMEOUT_MS = 30000
+PAGE_WORKERS = 4        # 同時開幾個分頁（各自一個 browser context）
+RECYCLE_AFTER = 50      # 每個 context 處理幾頁就關掉重開，避免記憶體越吃越多
+
+# ===== 精簡載入 =====
+BLOCK_RESOURCE_TYPES = ["image", "media", "font"]   # 不下載的資源類型；加 "stylesheet" = 連 CSS 都不載
+BLOCK_TRACKERS = True         # 擋廣告 / 追蹤 / 統計（pw_pool.TRACKER_HOSTS）
+BLOCK_SERVICE_WORKERS = True  # 不讓網站註冊 service worker（不然攔截會漏掉它發的請求）
+READY_STABLE_MS = 500         # DOM 好了之後，內文多久沒再變長就算載入完成
+READY_MAX_MS = 5000           # 最多等多久（等不到也照樣取內容）
 
 
 def sanitize_filename(name: str) -> str:
@@ -84,39 +97,43 @@ def extract_date_from_url(url: str):
     return parse_date_loose(url)
 
 
-def extract_publish_date(page, response, url: str):
-    meta_selectors = [
-        'meta[property="article:published_time"]',
-        'meta[property="og:published_time"]',
-        'meta[name="pubdate"]',
-        'meta[name="publish-date"]',
-        'meta[name="date"]',
-        'meta[itemprop="datePublished"]',
-        'meta[name="datePublished"]',
-    ]
-
-    # 1) meta（先 count() 再取 attribute，避免 locator 不存在直接炸）
-    for sel in meta_selectors:
-        try:
-            loc = page.locator(sel)
-            if loc.count() > 0:
-                val = loc.first.get_attribute("content")
-                d = parse_date_loose(val or "")
-                if d:
-                    return d
-        except Exception:
-            pass
+META_DATE_SELECTORS = [
+    'meta[property="article:published_time"]',
+    'meta[property="og:published_time"]',
+    'meta[name="pubdate"]',
+    'meta[name="publish-date"]',
+    'meta[name="date"]',
+    'meta[itemprop="datePublished"]',
+    'meta[name="datePublished"]',
+]
+
+# 一次 evaluate 把要的東西全部帶回來（原本每個 selector 各跑一趟 count() + get_attribute()）
+PAGE_DATA_JS = """(dateSelectors) => {
+    const attr = (sel, name) => { const el = document.querySelector(sel); return el ? el.getAttribute(name) : null; };
+    return {
+        title: document.title || "",
+        text: document.body ? document.body.innerText : "",
+        metaDates: dateSelectors.map(sel => attr(sel, "content")),
+        timeDatetime: attr("time[datetime]", "datetime"),
+        headings: Array.from(document.querySelectorAll("h1, h2, h3, h4"))
+            .map(h => [h.tagName.toLowerCase(), h.innerText.trim()]).filter(h => h[1]),
+        images: Array.from(document.images).map(img => img.currentSrc || img.src).filter(Boolean),
+    };
+}"""
+
+
+def extract_publish_date(data: dict, response, url: str):
+    """data = PAGE_DATA_JS 的結果；順序同舊版：meta → <time datetime> → HTTP Last-Modified → URL"""
+    # 1) meta
+    for val in data.get("metaDates") or []:
+        d = parse_date_loose(val or "")
+        if d:
+            return d
 
     # 2) <time datetime="">
-    try:
-        loc = page.locator("time[datetime]")
-        if loc.count() > 0:
-            val = loc.first.get_attribute("datetime")
-            d = parse_date_loose(val or "")
-            if d:
-                return d
-    except Exception:
-        pass
+    d = parse_date_loose(data.get("timeDatetime") or "")
+    if d:
+        return d
 
     # 3) HTTP Last-Modified
     try:
@@ -136,22 +153,23 @@ def extract_publish_date(page, response, url: str):
     return extract_date_from_url(url)
 
 
-def fetch_page_all(page, url: str):
-    resp = page.goto(url, wait_until="domcontentloaded", timeout=NAV_TIMEOUT_MS)
+async def fetch_page_all(page, url: str):
+    """回傳 dict：title / text / pub_date / headings [(h1, 文字)] / images [網址]"""
+    resp = await page.goto(url, wait_until="domcontentloaded", timeout=NAV_TIMEOUT_MS)
+    await pw_pool.wait_text_ready(page, READY_STABLE_MS, READY_MAX_MS)
 
     try:
-        title = (page.title() or "").strip()
+        data = await page.evaluate(PAGE_DATA_JS, META_DATE_SELECTORS) or {}
     except Exception:
-        title = ""
+        data = {}
 
-    try:
-        text = page.evaluate("() => document.body ? document.body.innerText : ''") or ""
-        text = text.strip()
-    except Exception:
-        text = ""
-
-    pub_date = extract_publish_date(page, resp, url)
-    return title, text, pub_date
+    return {
+        "title": (data.get("title") or "").strip(),
+        "text": (data.get("text") or "").strip(),
+        "pub_date": extract_publish_date(data, resp, url),
+        "headings": [tuple(h) for h in data.get("headings") or []],
+        "images": data.get("images") or [],
+    }
 
 
 def write_docx(title: str, url: str, text: str, out_path: str):
@@ -177,6 +195,98 @@ def write_docx(title: str, url: str, text: str, out_path: str):
     doc.save(out_path)
 
 
+async def process_one(page, item, counts: dict):
+    idx, url, name_in_csv = item
+    try:
+        await _process_one(page, idx, url, name_in_csv, counts)
+    finally:
+        # 不管怎麼結束（輸出 / 跳過 / 失敗），後面同名的不用再等這一筆
+        settle_output(idx)
+
+
+async def _process_one(page, idx: int, url: str, name_in_csv: str, counts: dict):
+    print(f"\n[DO] ({idx}) {url}")
+
+    try:
+        data = await fetch_page_all(page, url)
+    except PWTimeoutError:
+        print(f"[ERR] ({idx}) 逾時：{url}")
+        counts["fail"] += 1
+        return
+    except Exception as e:
+        print(f"[ERR] ({idx}) 失敗：{url}\n      {e}")
+        counts["fail"] += 1
+        return
+
+    title, text, pub_date = data["title"], data["text"], data["pub_date"]
+    if not pub_date:
+        print(f"[WARN] ({idx}) 抓不到日期，使用 00000000")
+        date_str = "00000000"
+    else:
+        try:
+            date_str = pub_date.strftime("%Y%m%d")
+        except Exception:
+            date_str = "00000000"
+
+    name = sanitize_filename(name_in_csv)
+    if not name:
+        name = sanitize_filename(title)
+    if not name:
+        name = derive_name_from_url(url)
+    if not name:
+        name = "unnamed"
+
+    out_path = os.path.join(OUT_DIR, f"{date_str}_{name}.docx")
+
+    # 幾個分頁同時跑：照 CSV 順序登記檔名（同名時前面那筆拿到，跟一筆一筆跑一樣）；
+    # 登記要等前面的定案，丟執行緒等，不卡住其他分頁
+    claimed = await asyncio.to_thread(claim_output, out_path, idx)
+    if os.path.exists(out_path) or not claimed:
+        print(f"[SKIP] 已存在：{os.path.basename(out_path)}")
+        return
+
+    try:
+        # 寫 docx 不卡住其他分頁
+        await asyncio.to_thread(write_docx, title=title, url=url, text=text, out_path=out_path)
+        print(f"[OK]  輸出：{os.path.basename(out_path)} | 小標 {len(data['headings'])} | 圖片 {len(data['images'])}")
+        counts["ok"] += 1
+    except Exception as e:
+        print(f"[ERR] 寫入 DOCX 失敗：{e}")
+        counts["fail"] += 1
+
+
+async def run(items):
+    counts = {"ok": 0, "fail": 0}
+
+    async def handle(page, item):
+        await process_one(page, item, counts)
+
+    async def on_error(item, exc):
+        # 開不了分頁（瀏覽器掛了）→ process_one 沒跑到，這裡定案，後面同名的才不會一直等
+        idx, url, _ = item
+        settle_output(idx)
+        print(f"[ERR] ({idx}) 瀏覽器分頁開不了：{url}\n      {type(exc).__name__}: {exc}")
+
+    blocker = pw_pool.ResourceBlocker(BLOCK_RESOURCE_TYPES, BLOCK_TRACKERS)
+    context_kwargs = {"service_workers": "block"} if BLOCK_SERVICE_WORKERS else {}
+
+    async with async_playwright() as p:
+        print("[INFO] Playwright 啟動 OK")
+        browser = await p.chromium.launch(headless=True)
+        print(f"[INFO] 分頁數：{PAGE_WORKERS}（每 {RECYCLE_AFTER} 頁換新 context）")
+        begin_claim_round([idx for idx, _, _ in items])
+        stats = await pw_pool.run_pool(browser, items, handle,
+                                       workers=PAGE_WORKERS, recycle_after=RECYCLE_AFTER,
+                                       context_kwargs=context_kwargs, setup_context=blocker.setup,
+                                       on_error=on_error)
+        await browser.close()
+
+    counts["fail"] += stats["fail"]
+    print(f"[INFO] 共開過 {stats['contexts']} 個 context")
+    print(f"[INFO] 請求：{blocker.summary()}")
+    return counts
+
+
 def main():
     print("[START] web_csv_to_docx")
     print(f"[INFO] Python: {sys.executable}")
@@ -197,69 +307,10 @@ def main():
         print("[WARN] CSV 沒有讀到任何 URL（A欄可能是空的，或第一列就空）")
         return
 
-    # ✅ 這行一定要有冒號
-    with sync_playwright() as p:
-        print("[INFO] Playwright 啟動 OK")
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
-
-        ok = 0
-        fail = 0
-
-        for idx, (url, name_in_csv) in enumerate(items, start=1):
-            url = (url or "").strip()
-            if not url:
-                continue
-
-            print(f"\n[DO] ({idx}) {url}")
-
-            try:
-                title, text, pub_date = fetch_page_all(page, url)
-            except PWTimeoutError:
-                print(f"[ERR] ({idx}) 逾時：{url}")
-                fail += 1
-                continue
-            except Exception as e:
-                print(f"[ERR] ({idx}) 失敗：{url}\n      {e}")
-                fail += 1
-                continue
-
-            if not pub_date:
-                print(f"[WARN] ({idx}) 抓不到日期，使用 00000000")
-                date_str = "00000000"
-            else:
-                try:
-                    date_str = pub_date.strftime("%Y%m%d")
-                except Exception:
-                    date_str = "00000000"
-
-            name = sanitize_filename(name_in_csv)
-            if not name:
-                name = sanitize_filename(title)
-            if not name:
-                name = derive_name_from_url(url)
-            if not name:
-                name = "unnamed"
-
-            out_path = os.path.join(OUT_DIR, f"{date_str}_{name}.docx")
-
-            if os.path.exists(out_path):
-                print(f"[SKIP] 已存在：{os.path.basename(out_path)}")
-                continue
-
-            try:
-                write_docx(title=title, url=url, text=text, out_path=out_path)
-                print(f"[OK]  輸出：{os.path.basename(out_path)}")
-                ok += 1
-            except Exception as e:
-                print(f"[ERR] 寫入 DOCX 失敗：{e}")
-                fail += 1
-
-        context.close()
-        browser.close()
+    work = [(idx, url.strip(), name) for idx, (url, name) in enumerate(items, start=1) if (url or "").strip()]
+    counts = asyncio.run(run(work))
 
-    print(f"\n[DONE] OK={ok}, FAIL={fail}")
+    print(f"\n[DONE] OK={counts['ok']}, FAIL={counts['fail']}")
 
 
 if __name__ == "__main__":
@@ -1,20 +1,30 @@
 # 檔名：P爬文章批次轉成docx_痞客邦.py
 import os
 import re
-import time
+import sys
 import json
 import csv
+import asyncio
+import hashlib
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from io import BytesIO
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, Tag
 from docx import Document
 from docx.shared import Inches
 from docx.image.exceptions import UnrecognizedImageError
 
+import html_backend
+import http_client
+from img_cache import ImageCache
+from job_ledger import JobLedger, DONE_STATUSES
+from output_claim import begin_claim_round, claim_output, settle_output
+
 # 可選：用來把 webp 轉 png（沒裝也沒關係，會自動跳過）
 try:
     from PIL import Image
@@ -22,11 +32,64 @@ try:
 except Exception:
     PIL_OK = False
 
+# 可選：JS 才長出內容的網頁改用瀏覽器重抓（沒裝 playwright 就照舊只用 requests）
+try:
+    from playwright.async_api import async_playwright
+    import pw_pool
+    PW_OK = True
+except Exception:
+    PW_OK = False
+
 
 # ===== 你環境的路徑 =====
 CSV_PATH = r"F:\F\AI\web\web.csv"   # A欄=網址，B欄=名稱(可空)
 OUT_DIR  = r"F:\F\AI\web"          # docx 輸出資料夾
-SLEEP_SEC = 0.5                    # 下載圖片間隔
+
+# ===== 圖片下載 =====
+IMG_WORKERS = 6                    # 每篇文章同時下載幾張圖
+IMG_CACHE_DIR = os.path.join(OUT_DIR, "_img_cache")   # 圖片快取（跨執行共用，刪掉就等於清快取）
+IMG_CACHE_MAX_MB = 2048            # 快取上限，超過就刪最久沒用的
+
+# ===== 網頁 HTTP 快取 =====
+HTML_CACHE_DIR = os.path.join(OUT_DIR, "_html_cache")  # 存 HTML + ETag/Last-Modified，重跑只會拿到 304
+HTTP_OFFLINE = False               # True = 完全不連網，只回放快取（重現抽取問題用）
+
+# ===== HTML 解析 =====
+PARSER_BACKEND = "bs4"             # "bs4" = BeautifulSoup（參考版）；"lxml" = 直接用 lxml（快，大量批次用）
+
+# ===== 工作紀錄（可續跑） =====
+LEDGER_PATH = os.path.join(OUT_DIR, "_jobs.sqlite3")     # 每個網址的狀態/輸出檔/耗時/錯誤，跑過的網址下次不用連網就能跳過
+# 執行參數：
+#   （不加）          全部跑，已完成的跳過
+#   --resume          只跑還沒完成的（失敗過的不重試）
+#   --retry-failed    只重跑上次失敗的
+
+# ===== 批次併發 =====
+MAX_WORKERS = 8                    # 同時處理幾篇文章（1 = 跟舊版一樣逐篇跑）
+PER_HOST_LIMIT = 4                 # 同一個網站最多同時幾個連線（避免被擋）
+CPU_WORKERS = os.cpu_count() or 1  # 解析 HTML / 組 docx 用幾個 process（0 = 不開 process pool，全部在執行緒裡跑）
+
+# ===== HTTP 重試 / 限速（http_client.py，網頁和圖片共用） =====
+HOST_RATE_PER_SEC = 2.0            # 每個網站一開始每秒幾個請求（取代舊的固定 sleep 0.5 秒）
+HOST_MAX_RATE_PER_SEC = 8.0        # 網站一直很順時最多加速到這裡；出錯會自動減半
+HOST_BURST = 4                     # 一開始可以連發幾個
+HTTP_RETRIES = 4                   # 429 / 5xx / 逾時最多重試幾次（指數退避 + Retry-After）
+
+# ===== 混合抓取：先用 requests，內容太少才交給瀏覽器 =====
+HYBRID_BROWSER = True              # True = 抓到的頁面幾乎沒內容（JS 才長出來）就在第二輪用 Playwright 重抓
+THIN_TEXT_BLOCKS = 2               # 正文文字區塊 <= 這個數、又沒有 __NEXT_DATA__/Nuxt 保底內容 → 算「太少」
+BROWSER_WORKERS = 2                # 第二輪同時開幾個瀏覽器分頁
+BROWSER_RECYCLE_AFTER = 50         # 每個瀏覽器 context 處理幾頁就換新
+BROWSER_NAV_TIMEOUT_MS = 30000
+HOST_LEARN_MIN = 3                 # 同一網站累計幾次「要瀏覽器才有內容」（且 requests 幾乎沒成功過）之後，直接走瀏覽器
+
+# headers：沿用單次版那套（你單次能抓到內容就別亂改）
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "zh-TW,zh;q=0.9,en;q=0.6",
+    "Referer": "https://www.codefather.cn/",
+}
 
 
 # ========== 單次版：safe_filename（同邏輯） ==========
@@ -71,16 +134,61 @@ def read_urls_from_csv(csv_path: str):
     raise last_err
 
 
+# ========== HTML 解析（依 PARSER_BACKEND 選後端） ==========
+def parse_page(html: str):
+    if PARSER_BACKEND == "lxml":
+        return html_backend.parse(html)
+    return BeautifulSoup(html, "lxml")
+
+
+def page_title_of(soup):
+    """同 soup.title.get_text(strip=True)；沒有 <title> 回 None"""
+    if html_backend.is_lxml(soup):
+        return html_backend.page_title(soup)
+    return soup.title.get_text(strip=True) if soup.title else None
+
+
 # ========== 單次版：fetch_html（同邏輯） ==========
 def fetch_html(session: requests.Session, url: str) -> str:
     url = url.split("#", 1)[0]
-    r = session.get(url, timeout=30)
+    r = http_client.get(session, url, timeout=30)
     r.raise_for_status()
     if not r.encoding or r.encoding.lower() == "iso-8859-1":
         r.encoding = r.apparent_encoding or "utf-8"
     return r.text
 
 
+# ========== 混合抓取：判斷要不要改用瀏覽器 ==========
+def looks_like_pixnet_post(html: str, url: str) -> bool:
+    # Pixnet 文章頁通常會包含 blog/posts/<id>
+    if "/blog/posts/" in url:
+        # HTML 裡如果完全沒有 posts id 或 post 相關結構，可能被導到別頁
+        if re.search(r"/blog/posts/\d+", html):
+            return True
+        # 退而求其次：出現 pixnet 文章常見字樣
+        if "pixnet" in html.lower() and ("文章" in html or "發表" in html):
+            return True
+        return False
+    return True
+
+
+def is_thin_article(article: dict, html: str) -> bool:
+    """正文幾乎沒字、script JSON 也撈不到東西，或不像痞客邦文章頁 → 多半要跑 JS 才有內容"""
+    if not looks_like_pixnet_post(html, article["url"]):
+        return True
+    text_count = sum(1 for b in article["blocks"] if b[0] != "img")
+    return text_count <= THIN_TEXT_BLOCKS and not article["fallback"]
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def host_prefers_browser(ledger: JobLedger, url: str) -> bool:
+    http_ok, browser_needed = ledger.host_stats(host_of(url))
+    return browser_needed >= HOST_LEARN_MIN and browser_needed > http_ok * 4
+
+
 # =========================
 # ✅ 單次版：選「最像正文」的容器
 # =========================
@@ -123,31 +231,141 @@ def _node_score(node) -> int:
     return score
 
 
-def pick_content_root(soup: BeautifulSoup):
-    selectors = [
-        "article",
-        "main",
-        ".vditor-reset",
-        ".markdown-body",
-        ".post-detail",
-        ".post-content",
-        ".entry-content",
-        ".article-content",
-        ".content",
-        "#content",
-        "#__next",
-        "body",
-    ]
+# ----- 一次走完整棵樹算好每個節點的統計，候選人直接查表（不用每個候選都 find_all 一次）-----
+# tag → _node_score 裡的欄位
+_SCORE_TAG_FIELD = {
+    "p": "p", "li": "li",
+    "h1": "h", "h2": "h", "h3": "h", "h4": "h",
+    "pre": "pre", "code": "code", "blockquote": "bq", "img": "img",
+    "nav": "bad", "header": "bad", "footer": "bad", "aside": "bad",
+}
+_SCORE_FIELDS = ("p", "li", "h", "pre", "code", "bq", "img", "bad", "tlen", "nstr")
+
+
+def _is_text_string(s, types) -> bool:
+    # 跟 bs4 get_text() 的判斷一致（排除註解、script/style 內的字串）
+    if isinstance(types, type):
+        return type(s) is types
+    return types is None or type(s) in types
+
+
+def compute_subtree_stats(soup):
+    """由下往上走一次，回傳 {id(tag): [p, li, h, pre, code, bq, img, bad, 文字總長, 字串數]}（不含自己）"""
+    types = soup.interesting_string_types
+    if types is None:
+        types = Tag.MAIN_CONTENT_STRING_TYPES
+
+    tags = [soup] + [el for el in soup.descendants if isinstance(el, Tag)]
+    idx = {f: i for i, f in enumerate(_SCORE_FIELDS)}
+    i_tlen, i_nstr = idx["tlen"], idx["nstr"]
+
+    stats = {}
+    # 前序的反向 = 子節點一定比父節點先算
+    for tag in reversed(tags):
+        agg = [0] * len(_SCORE_FIELDS)
+        for child in tag.contents:
+            if isinstance(child, Tag):
+                c = stats[id(child)]
+                for i in range(len(agg)):
+                    agg[i] += c[i]
+                field = _SCORE_TAG_FIELD.get(child.name)
+                if field:
+                    agg[idx[field]] += 1
+            elif isinstance(child, NavigableString) and _is_text_string(child, types):
+                t = child.strip()
+                if t:
+                    agg[i_tlen] += len(t)
+                    agg[i_nstr] += 1
+        stats[id(tag)] = agg
+    return stats
+
+
+def _node_score_from_stats(node, st) -> int:
+    p, li, h, pre, code, bq, img, bad, tlen, nstr = st
+    # get_text(" ") 會在字串之間補空白
+    tlen += max(nstr - 1, 0)
+
+    cls = " ".join(node.get("class", [])).lower()
+    nid = (node.get("id") or "").lower()
+    if any(k in cls for k in ["comment", "sidebar", "related", "recommend", "widget", "breadcrumb", "footer"]):
+        bad += 10
+    if any(k in nid for k in ["comment", "sidebar", "related", "recommend", "footer"]):
+        bad += 10
 
+    score = 0
+    score += min(tlen, 20000)
+    score += p * 300
+    score += li * 120
+    score += h * 200
+    score += pre * 200
+    score += code * 50
+    score += bq * 150
+    score += img * 10
+    score -= bad * 500
+    return score
+
+
+CONTENT_ROOT_SELECTORS = [
+    "article",
+    "main",
+    ".vditor-reset",
+    ".markdown-body",
+    ".post-detail",
+    ".post-content",
+    ".entry-content",
+    ".article-content",
+    ".content",
+    "#content",
+    "#__next",
+    "body",
+]
+
+
+def _content_root_candidates_select(soup):
     candidates = []
-    for sel in selectors:
+    for sel in CONTENT_ROOT_SELECTORS:
         for node in soup.select(sel):
             candidates.append(node)
+    return candidates
 
+
+def _content_root_candidates(soup):
+    """同 _content_root_candidates_select，但只走一次樹（selector 都是 tag / .class / #id 這種簡單的）"""
+    buckets = [[] for _ in CONTENT_ROOT_SELECTORS]
+    rules = [(sel[0], sel[1:]) if sel[0] in ".#" else ("", sel) for sel in CONTENT_ROOT_SELECTORS]
+    for el in soup.descendants:
+        if not isinstance(el, Tag):
+            continue
+        for i, (kind, val) in enumerate(rules):
+            if kind == ".":
+                if val in (el.get("class") or []):
+                    buckets[i].append(el)
+            elif kind == "#":
+                if el.get("id") == val:
+                    buckets[i].append(el)
+            elif el.name == val:
+                buckets[i].append(el)
+    return [node for b in buckets for node in b]
+
+
+def pick_content_root_slow(soup: BeautifulSoup):
+    """舊版：每個候選各自 find_all（留著給 bench_pick_content_root.py 對照）"""
+    candidates = _content_root_candidates_select(soup)
     if not candidates:
         return soup.body or soup
+    return max(candidates, key=_node_score)
 
-    best = max(candidates, key=_node_score)
+
+def pick_content_root(soup: BeautifulSoup):
+    if html_backend.is_lxml(soup):
+        return html_backend.pick_content_root(soup)
+
+    candidates = _content_root_candidates(soup)
+    if not candidates:
+        return soup.body or soup
+
+    stats = compute_subtree_stats(soup)
+    best = max(candidates, key=lambda n: _node_score_from_stats(n, stats[id(n)]))
     return best
 
 
@@ -161,6 +379,10 @@ def is_probably_nav_or_junk(tag) -> bool:
 
 
 def iter_content_blocks(root):
+    if html_backend.is_lxml(root):
+        yield from html_backend.iter_content_blocks(root)
+        return
+
     for t in root.find_all(["script", "style", "noscript"]):
         t.decompose()
 
@@ -209,7 +431,7 @@ def iter_content_blocks(root):
 
 def download_image(session: requests.Session, img_url: str):
     try:
-        r = session.get(img_url, timeout=30)
+        r = http_client.get(session, img_url, timeout=30)
         r.raise_for_status()
         ctype = (r.headers.get("Content-Type") or "").lower()
         if "image" not in ctype:
@@ -219,6 +441,54 @@ def download_image(session: requests.Session, img_url: str):
         return None, ""
 
 
+def resolve_img_url(page_url: str, src: str):
+    """img src → 絕對網址；svg/ico 這種 docx 放不進去的直接回 None"""
+    img_url = urljoin(page_url.split("#", 1)[0], src)
+    path = urlparse(img_url).path.lower()
+    if any(path.endswith(x) for x in [".svg", ".ico"]):
+        return None
+    return img_url
+
+
+def _download_and_store(session: requests.Session, img_url: str, img_cache: ImageCache = None):
+    img, ctype = download_image(session, img_url)
+    if not img:
+        return None, ctype
+
+    converted = maybe_convert_webp_to_png_bytes(img, ctype, img_url)
+    if img_cache is not None:
+        try:
+            img_cache.put(img_url, img, ctype, converted)
+        except Exception as e:
+            print(f"[WARN] 圖片快取寫入失敗：{img_url} | {e}")
+
+    if converted:
+        return converted, "image/png"
+    return img, ctype
+
+
+def load_image(session: requests.Session, img_url: str, img_cache: ImageCache = None):
+    """先查快取，沒有才下載；回傳 (可直接放進 docx 的 bytes, ctype)，webp 會先轉好 png。
+    別篇文章正在下載同一張圖時，等那次下載完共用，不重抓"""
+    if img_cache is None:
+        return _download_and_store(session, img_url)
+    return img_cache.get_or_load(img_url, lambda: _download_and_store(session, img_url, img_cache))
+
+
+def prefetch_images(session: requests.Session, img_urls, img_cache: ImageCache = None):
+    """整篇文章的圖片一次並行下載（有快取先用快取），回傳 {img_url: (bytes, ctype)}"""
+    uniq = list(dict.fromkeys(u for u in img_urls if u))
+    if not uniq:
+        return {}
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(IMG_WORKERS, len(uniq)))) as ex:
+        futures = {ex.submit(load_image, session, u, img_cache): u for u in uniq}
+        for fut in as_completed(futures):
+            results[futures[fut]] = fut.result()
+    return results
+
+
 # --------- 單次版保底：從 Next/Nuxt JSON 找正文 ---------
 def _extract_next_data_json(html: str):
     m = re.search(r'<script[^>]+id="__NEXT_DATA__"[^>]*>(.*?)</script>', html, re.S | re.I)
@@ -332,6 +602,9 @@ def _parse_date_to_yyyymmdd(s: str):
 
 
 def extract_date8(soup: BeautifulSoup, html: str) -> str:
+    if html_backend.is_lxml(soup):
+        return html_backend.extract_date8(soup, html)
+
     meta_keys = [
         ("property", "article:published_time"),
         ("property", "og:published_time"),
@@ -395,19 +668,46 @@ def clean_title_like_js(title: str) -> str:
     return t
 
 
+def save_docx_atomic(doc: Document, out_path: str):
+    """先存暫存檔再 rename，當掉也不會留下寫一半的 docx"""
+    tmp = f"{out_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        doc.save(tmp)
+        os.replace(tmp, out_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def select_items(items, ledger: JobLedger, mode: str):
+    """依執行模式挑出這次要跑的網址"""
+    if mode == "all":
+        return items
+
+    picked = []
+    for url, name in items:
+        job = ledger.get(url)
+        status = job["status"] if job else None
+        if mode == "retry-failed" and status == "failed":
+            picked.append((url, name))
+        elif mode == "resume" and status != "failed" and status not in DONE_STATUSES:
+            picked.append((url, name))
+    return picked
+
+
 # =========================
 # ✅ 批次：把「單次流程」包成一個函式
 # =========================
-def build_docx_for_one_url(session: requests.Session, url: str, name_from_csv: str):
-    html = fetch_html(session, url)
-    soup = BeautifulSoup(html, "lxml")
-
+def plan_output(url: str, name_from_csv: str, soup: BeautifulSoup, html: str):
+    """算出 (輸出路徑, 標題, 日期)"""
     # 檔名：B欄優先；B欄空白 → 用頁面 title
     if name_from_csv and name_from_csv.strip():
         file_base = safe_filename(name_from_csv.strip())
         page_title = name_from_csv.strip()
     else:
-        page_title = soup.title.get_text(strip=True) if soup.title else "article"
+        page_title = page_title_of(soup)
+        if page_title is None:
+            page_title = "article"
         page_title = clean_title_like_js(page_title)
         file_base = safe_filename(page_title)
 
@@ -416,129 +716,291 @@ def build_docx_for_one_url(session: requests.Session, url: str, name_from_csv: s
 
     # 輸出檔名：YYYYMMDD_名稱.docx（你要的格式）
     out_path = os.path.join(OUT_DIR, f"{date8}_{file_base}.docx")
+    return out_path, page_title, date8
 
-    # 內容：完全照單次版
-    doc = Document()
-    doc.add_heading(page_title, level=0)
-    doc.add_paragraph(f"來源網址：{url}")
-    doc.add_paragraph(f"建檔日期：{date8}")
-    doc.add_paragraph("")
 
-    root = pick_content_root(soup)
+# ========== CPU 階段（可丟到 process pool）：解析 / 組 docx ==========
+# 傳進傳出的都是字串、bytes、list、dict，才能在 process 之間 pickle
+def extract_article(url: str, name_from_csv: str, html: str) -> dict:
+    """解析 HTML → 輸出路徑、標題、日期、正文區塊、保底內容、要下載的圖片網址"""
+    soup = parse_page(html)
+    out_path, page_title, date8 = plan_output(url, name_from_csv, soup, html)
 
-    img_count = 0
-    text_count = 0
+    blocks = list(iter_content_blocks(pick_content_root(soup)))
+    text_count = sum(1 for b in blocks if b[0] != "img")
 
-    blocks = list(iter_content_blocks(root))
-    for block in blocks:
-        kind = block[0]
+    # ✅ 保底：如果 DOM 幾乎抓不到文字，就從 script JSON 抽正文（單次版保底）
+    fallback = None
+    if text_count <= 2:
+        extracted = try_extract_article_text_from_scripts(html)
+        if extracted:
+            if "<p" in extracted or "<h" in extracted or "</" in extracted:
+                root2 = pick_content_root(parse_page(extracted))
+                fallback = ("blocks", [b for b in iter_content_blocks(root2) if b[0] != "img"])
+            else:
+                fallback = ("text", extracted)
 
-        if kind == "heading":
-            _, tagname, txt = block
-            level_map = {"h1": 1, "h2": 2, "h3": 3, "h4": 4}
-            doc.add_heading(txt, level=level_map.get(tagname, 2))
-            text_count += 1
+    return {
+        "url": url,
+        "out_path": out_path,
+        "page_title": page_title,
+        "date8": date8,
+        "blocks": blocks,
+        "fallback": fallback,
+        "img_urls": [resolve_img_url(url, b[1]) for b in blocks if b[0] == "img"],
+    }
 
-        elif kind == "p":
-            _, txt = block
-            doc.add_paragraph(txt)
-            text_count += 1
 
-        elif kind == "li":
-            _, txt = block
-            doc.add_paragraph(txt, style="List Bullet")
-            text_count += 1
+def _add_text_block(doc: Document, block) -> bool:
+    kind = block[0]
 
-        elif kind == "quote":
-            _, txt = block
-            doc.add_paragraph(txt, style="Intense Quote")
-            text_count += 1
+    if kind == "heading":
+        _, tagname, txt = block
+        level_map = {"h1": 1, "h2": 2, "h3": 3, "h4": 4}
+        doc.add_heading(txt, level=level_map.get(tagname, 2))
 
-        elif kind == "codeblock":
-            _, txt = block
-            p = doc.add_paragraph()
-            run = p.add_run(txt)
-            run.font.name = "Consolas"
-            text_count += 1
+    elif kind == "p":
+        _, txt = block
+        doc.add_paragraph(txt)
 
-        elif kind == "img":
-            _, src, alt = block
-            img_url = urljoin(url.split("#", 1)[0], src)
+    elif kind == "li":
+        _, txt = block
+        doc.add_paragraph(txt, style="List Bullet")
 
-            path = urlparse(img_url).path.lower()
-            if any(path.endswith(x) for x in [".svg", ".ico"]):
-                continue
+    elif kind == "quote":
+        _, txt = block
+        doc.add_paragraph(txt, style="Intense Quote")
 
-            img, ctype = download_image(session, img_url)
-            if not img:
-                continue
+    elif kind == "codeblock":
+        _, txt = block
+        p = doc.add_paragraph()
+        run = p.add_run(txt)
+        run.font.name = "Consolas"
 
-            if alt:
-                doc.add_paragraph(alt)
+    else:
+        return False
+    return True
 
-            try:
-                converted = maybe_convert_webp_to_png_bytes(img, ctype, img_url)
-                if converted:
-                    doc.add_picture(BytesIO(converted), width=Inches(6.0))
-                else:
-                    doc.add_picture(BytesIO(img), width=Inches(6.0))
 
-                img_count += 1
-                time.sleep(SLEEP_SEC)
+def assemble_docx(article: dict, images: dict):
+    """照 extract_article 的結果組出 docx 並存檔；images = {img_url: (bytes, ctype)}。回傳 (文字數, 圖片數)"""
+    url = article["url"]
 
-            except UnrecognizedImageError:
-                # 單次版也是跳過
-                continue
-            except Exception:
-                continue
+    # 內容：完全照單次版
+    doc = Document()
+    doc.add_heading(article["page_title"], level=0)
+    doc.add_paragraph(f"來源網址：{url}")
+    doc.add_paragraph(f"建檔日期：{article['date8']}")
+    doc.add_paragraph("")
 
-    # ✅ 保底：如果 DOM 幾乎抓不到文字，就從 script JSON 抽正文（單次版保底）
-    if text_count <= 2:
-        extracted = try_extract_article_text_from_scripts(html)
-        if extracted:
-            doc.add_page_break()
-            doc.add_heading("（保底抽取內容）", level=1)
+    img_count = 0
+    text_count = 0
 
-            if "<p" in extracted or "<h" in extracted or "</" in extracted:
-                soup2 = BeautifulSoup(extracted, "lxml")
-                root2 = pick_content_root(soup2)
-                for block in iter_content_blocks(root2):
-                    kind = block[0]
-                    if kind == "heading":
-                        _, tagname, txt = block
-                        level_map = {"h1": 1, "h2": 2, "h3": 3, "h4": 4}
-                        doc.add_heading(txt, level=level_map.get(tagname, 2))
-                        text_count += 1
-                    elif kind == "p":
-                        _, txt = block
-                        doc.add_paragraph(txt)
-                        text_count += 1
-                    elif kind == "li":
-                        _, txt = block
-                        doc.add_paragraph(txt, style="List Bullet")
-                        text_count += 1
-                    elif kind == "quote":
-                        _, txt = block
-                        doc.add_paragraph(txt, style="Intense Quote")
-                        text_count += 1
-                    elif kind == "codeblock":
-                        _, txt = block
-                        p = doc.add_paragraph()
-                        run = p.add_run(txt)
-                        run.font.name = "Consolas"
-                        text_count += 1
-            else:
-                add_plaintext_to_doc(doc, extracted)
+    for block in article["blocks"]:
+        if block[0] != "img":
+            if _add_text_block(doc, block):
                 text_count += 1
+            continue
+
+        _, src, alt = block
+        img_url = resolve_img_url(url, src)
+        if not img_url:
+            continue
+
+        img, ctype = images.get(img_url, (None, ""))
+        if not img:
+            continue
+
+        if alt:
+            doc.add_paragraph(alt)
+
+        try:
+            # webp → png 已在 load_image 轉好（也會進快取）
+            doc.add_picture(BytesIO(img), width=Inches(6.0))
+            img_count += 1
+
+        except UnrecognizedImageError:
+            # 單次版也是跳過
+            continue
+        except Exception:
+            continue
 
-    doc.save(out_path)
-    return out_path, text_count, img_count, date8, page_title
+    fallback = article["fallback"]
+    if fallback:
+        doc.add_page_break()
+        doc.add_heading("（保底抽取內容）", level=1)
+
+        kind, payload = fallback
+        if kind == "blocks":
+            for block in payload:
+                if _add_text_block(doc, block):
+                    text_count += 1
+        else:
+            add_plaintext_to_doc(doc, payload)
+            text_count += 1
+
+    save_docx_atomic(doc, article["out_path"])
+    return text_count, img_count
+
+
+def run_cpu(cpu_pool, fn, *args):
+    """有 process pool 就丟過去跑（吃得到多核），沒有就在原執行緒跑"""
+    if cpu_pool is None:
+        return fn(*args)
+    return cpu_pool.submit(fn, *args).result()
+
+
+# ========== I/O 階段：抓網頁、抓圖片 ==========
+def build_docx_for_one_url(session: requests.Session, url: str, name_from_csv: str, img_cache: ImageCache = None,
+                           article: dict = None, cpu_pool=None):
+    # article：呼叫端已經抓過 + 解析過就直接傳進來，不要再抓一次
+    if article is None:
+        html = fetch_html(session, url)
+        article = run_cpu(cpu_pool, extract_article, url, name_from_csv, html)
+
+    # 圖片先全部找出來並行下載，組 docx 時再照原本順序插入
+    images = prefetch_images(session, article["img_urls"], img_cache)
+
+    text_count, img_count = run_cpu(cpu_pool, assemble_docx, article, images)
+    return article["out_path"], text_count, img_count, article["date8"], article["page_title"]
+
+
+def finish_one(session: requests.Session, idx: int, total: int, url: str, name_from_csv: str, html: str,
+               article: dict = None, img_cache: ImageCache = None, ledger: JobLedger = None, cpu_pool=None):
+    """拿到 HTML 之後的流程（requests 抓的、瀏覽器渲染的都走這裡），回傳 (狀態, 訊息)"""
+    content_hash = hashlib.sha256(html.encode("utf-8")).hexdigest()
+    if article is None:
+        article = run_cpu(cpu_pool, extract_article, url, name_from_csv, html)
+
+    # 先用 B 欄/頁面 title 算出輸出檔名，若存在就跳過
+    # （為了保留你要的：同名就覆蓋 or 跳過？這裡採「存在就跳過」）
+    # 若你要「覆蓋」我也可以改成直接寫入覆蓋。
+    tmp_name = name_from_csv.strip() if name_from_csv else ""
+    if not tmp_name:
+        out_peek = article["out_path"]
+        claimed = claim_output(out_peek, idx)
+        if os.path.exists(out_peek) or not claimed:
+            if ledger is not None:
+                ledger.finish(url, "skipped", out_peek, content_hash)
+            return "SKIP", f"[SKIP] ({idx}/{total}) 已存在：{os.path.basename(out_peek)}"
+
+    # 正式跑（完全走單次流程）
+    print(f"[DO] ({idx}/{total}) {url}")
+    out_path, text_count, img_count, date8, page_title = build_docx_for_one_url(
+        session, url, name_from_csv, img_cache, article=article, cpu_pool=cpu_pool
+    )
+    if ledger is not None:
+        ledger.finish(url, "done", out_path, content_hash)
+    return "OK", f"[OK]  ({idx}/{total}) {os.path.basename(out_path)} | 日期={date8} | 文字≈{text_count} | 圖片={img_count}"
+
+
+def process_one(session: requests.Session, idx: int, total: int, url: str, name_from_csv: str,
+                img_cache: ImageCache = None, ledger: JobLedger = None, cpu_pool=None, hybrid: bool = False):
+    """處理單一網址，回傳 (狀態, 訊息)，狀態為 OK / SKIP / FAIL；
+    hybrid=True 時內容太少的回 BROWSER（留給第二輪用瀏覽器重抓）"""
+    try:
+        # 1) ledger 記錄已完成且檔案還在 → 不連網直接跳過
+        if ledger is not None:
+            job = ledger.get(url)
+            if job and job["status"] in DONE_STATUSES and job["out_path"] and os.path.exists(job["out_path"]):
+                return "SKIP", f"[SKIP] ({idx}/{total}) 已存在（ledger）：{os.path.basename(job['out_path'])}"
+            ledger.start(url)
+
+        # 這個網站之前都要瀏覽器才有內容 → requests 這趟省了
+        if hybrid and ledger is not None and host_prefers_browser(ledger, url):
+            return "BROWSER", f"[INFO] ({idx}/{total}) 這個網站要用瀏覽器，排到第二輪：{url}"
+
+        # 2) 只抓一次、解析一次：算檔名跟建檔共用同一份結果
+        html = fetch_html(session, url)
+        article = run_cpu(cpu_pool, extract_article, url, name_from_csv, html)
+
+        if hybrid:
+            if is_thin_article(article, html):
+                return "BROWSER", f"[INFO] ({idx}/{total}) 內容太少，排到第二輪用瀏覽器：{url}"
+            if ledger is not None:
+                ledger.host_vote(host_of(url), needs_browser=False)
+
+        return finish_one(session, idx, total, url, name_from_csv, html, article, img_cache, ledger, cpu_pool)
+
+    except Exception as e:
+        if ledger is not None:
+            ledger.finish(url, "failed", error=f"{type(e).__name__}: {e}")
+        return "FAIL", f"[ERR] ({idx}/{total}) {url}\n      {e}"
+    finally:
+        # 不管怎麼結束（跳過 / 失敗 / 排到瀏覽器），後面的網址不用再等這一筆的檔名
+        settle_output(idx)
+
+
+# ========== 第二輪：瀏覽器 ==========
+async def render_html(page, url: str) -> str:
+    await page.goto(url.split("#", 1)[0], wait_until="domcontentloaded", timeout=BROWSER_NAV_TIMEOUT_MS)
+    await pw_pool.wait_text_ready(page)
+    return await page.content()
+
+
+def finish_rendered(session: requests.Session, idx: int, total: int, url: str, name_from_csv: str, html: str,
+                    img_cache: ImageCache = None, ledger: JobLedger = None, cpu_pool=None):
+    """瀏覽器渲染後的 HTML → 記下這個網站是不是真的要瀏覽器 → 照常建檔"""
+    article = run_cpu(cpu_pool, extract_article, url, name_from_csv, html)
+    if ledger is not None:
+        # 渲染後還是沒內容 = 瀏覽器也沒幫上忙，下次別白開
+        ledger.host_vote(host_of(url), needs_browser=not is_thin_article(article, html))
+    return finish_one(session, idx, total, url, name_from_csv, html, article, img_cache, ledger, cpu_pool)
+
+
+async def render_deferred(session: requests.Session, deferred, total: int, counts: dict, handled: set,
+                          img_cache: ImageCache = None, ledger: JobLedger = None, cpu_pool=None):
+    """deferred = [(idx, url, name)]，用瀏覽器分頁池重抓；處理過的 idx 放進 handled"""
+
+    async def handle(page, item):
+        idx, url, name_from_csv = item
+        handled.add(idx)
+        try:
+            html = await render_html(page, url)
+            # 解析、下載圖片、組 docx 都是同步的 → 丟執行緒，不卡其他分頁
+            status, msg = await asyncio.to_thread(
+                finish_rendered, session, idx, total, url, name_from_csv, html, img_cache, ledger, cpu_pool
+            )
+        except Exception as e:
+            if ledger is not None:
+                ledger.finish(url, "failed", error=f"{type(e).__name__}: {e}")
+            status, msg = "FAIL", f"[ERR] ({idx}/{total}) 瀏覽器：{url}\n      {e}"
+        finally:
+            settle_output(idx)
+        counts[status] += 1
+        print(msg)
+
+    async def on_error(item, exc):
+        # 開不了分頁（new_context 失敗、瀏覽器中途掛掉）→ handle 沒跑到，這筆馬上改用 requests 的版本；
+        # 不能等到整輪結束：同檔名排在後面的還在等這一筆定案
+        idx, url, name_from_csv = item
+        if idx in handled:
+            return
+        handled.add(idx)
+        print(f"[WARN] ({idx}/{total}) 瀏覽器分頁開不了（{type(exc).__name__}: {exc}），改用 requests 的版本")
+        status, msg = await asyncio.to_thread(
+            process_one, session, idx, total, url, name_from_csv, img_cache, ledger, cpu_pool
+        )
+        counts[status] += 1
+        print(msg)
+
+    # 圖片之後用 requests 下載，瀏覽器這邊只要 DOM：圖片 / 影音 / 字型 / 追蹤碼都擋掉
+    blocker = pw_pool.ResourceBlocker()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        await pw_pool.run_pool(browser, deferred, handle,
+                               workers=BROWSER_WORKERS, recycle_after=BROWSER_RECYCLE_AFTER,
+                               context_kwargs={"service_workers": "block", "user_agent": HEADERS["User-Agent"]},
+                               setup_context=blocker.setup, on_error=on_error)
+        await browser.close()
+    print(f"[INFO] 瀏覽器請求：{blocker.summary()}")
 
 
 def main():
     print("[START] 單次版 → 批次版（完全沿用單次正文抽取/保底抽文/日期）")
     print(f"[INFO] CSV_PATH: {CSV_PATH}")
     print(f"[INFO] OUT_DIR : {OUT_DIR}")
+    print(f"[INFO] 併發    : MAX_WORKERS={MAX_WORKERS}, PER_HOST_LIMIT={PER_HOST_LIMIT}, CPU_WORKERS={CPU_WORKERS}")
 
     if not os.path.isfile(CSV_PATH):
         print(f"[ERROR] 找不到 CSV：{CSV_PATH}")
@@ -553,55 +1015,93 @@ def main():
         print("[WARN] CSV 沒有任何網址")
         return
 
-    ok = 0
-    skip = 0
-    fail = 0
+    mode = "all"
+    if "--retry-failed" in sys.argv:
+        mode = "retry-failed"
+    elif "--resume" in sys.argv:
+        mode = "resume"
 
-    with requests.Session() as s:
-        # headers：沿用單次版那套（你單次能抓到內容就別亂改）
-        s.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-            "Accept-Language": "zh-TW,zh;q=0.9,en;q=0.6",
-            "Referer": "https://www.codefather.cn/",
-        })
+    ledger = JobLedger(LEDGER_PATH)
 
-        for idx, (url, name_from_csv) in enumerate(items, start=1):
-            try:
-                # 先用 B 欄/頁面 title 算出輸出檔名，若存在就跳過
-                # （為了保留你要的：同名就覆蓋 or 跳過？這裡採「存在就跳過」）
-                # 若你要「覆蓋」我也可以改成直接寫入覆蓋。
-                tmp_name = name_from_csv.strip() if name_from_csv else ""
-                if tmp_name:
-                    file_base = safe_filename(tmp_name)
-                else:
-                    # 先抓一次 title 來算檔名（避免每次都重抓）
-                    html_peek = fetch_html(s, url)
-                    soup_peek = BeautifulSoup(html_peek, "lxml")
-                    page_title_peek = soup_peek.title.get_text(strip=True) if soup_peek.title else "article"
-                    page_title_peek = clean_title_like_js(page_title_peek)
-                    file_base = safe_filename(page_title_peek)
-                    date8_peek = extract_date8(soup_peek, html_peek)
-                    out_peek = os.path.join(OUT_DIR, f"{date8_peek}_{file_base}.docx")
-                    if os.path.exists(out_peek):
-                        print(f"[SKIP] ({idx}/{len(items)}) 已存在：{os.path.basename(out_peek)}")
-                        skip += 1
-                        continue
-                    # 沒存在就直接用 peek 的 html 也行，但為了簡潔就下面正常跑一次 build
-
-                # 正式跑（完全走單次流程）
-                print(f"[DO] ({idx}/{len(items)}) {url}")
-                out_path, text_count, img_count, date8, page_title = build_docx_for_one_url(s, url, name_from_csv)
-
-                print(f"[OK]  {os.path.basename(out_path)} | 日期={date8} | 文字≈{text_count} | 圖片={img_count}")
-                ok += 1
+    items = select_items(items, ledger, mode)
+    print(f"[INFO] 模式：{mode}，這次要跑 {len(items)} 筆（紀錄檔：{LEDGER_PATH}）")
+    if not items:
+        ledger.close()
+        print("[DONE] 沒有需要處理的網址")
+        return
 
+    counts = {"OK": 0, "SKIP": 0, "FAIL": 0}
+    total = len(items)
+    workers = max(1, MAX_WORKERS)
+
+    img_cache = ImageCache(IMG_CACHE_DIR, max_bytes=IMG_CACHE_MAX_MB * 1024 * 1024)
+    print(f"[INFO] 圖片快取：{IMG_CACHE_DIR}")
+    print(f"[INFO] 網頁快取：{HTML_CACHE_DIR}" + ("（offline：只回放快取）" if HTTP_OFFLINE else ""))
+
+    # CPU 階段（解析 / 組 docx）丟到 process pool，才吃得到多核（執行緒會被 GIL 卡住）
+    cpu_pool = ProcessPoolExecutor(max_workers=CPU_WORKERS) if CPU_WORKERS > 0 else None
+
+    http_client.configure(
+        per_host_limit=PER_HOST_LIMIT,
+        rate=HOST_RATE_PER_SEC,
+        max_rate=HOST_MAX_RATE_PER_SEC,
+        burst=HOST_BURST,
+        retries=HTTP_RETRIES,
+    )
+
+    # 連線池要夠大，不然多執行緒會一直排隊等連線；HTML 走硬碟快取（條件式請求）
+    with http_client.make_session(
+        headers=HEADERS,
+        pool_maxsize=workers * PER_HOST_LIMIT,
+        cache_dir=HTML_CACHE_DIR,
+        offline=HTTP_OFFLINE,
+    ) as s:
+
+        hybrid = HYBRID_BROWSER and PW_OK
+        if HYBRID_BROWSER and not PW_OK:
+            print("[WARN] 沒有安裝 playwright：JS 才有內容的網頁只能用 requests 抓到的版本")
+        deferred = []
+
+        # 檔名照 CSV 順序分配（executor 也是照順序開始，前面的不會還沒開始跑）
+        begin_claim_round([idx for idx in range(1, total + 1)])
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futures = {
+                ex.submit(process_one, s, idx, total, url, name_from_csv, img_cache, ledger, cpu_pool, hybrid):
+                    (idx, url, name_from_csv)
+                for idx, (url, name_from_csv) in enumerate(items, start=1)
+            }
+            for fut in as_completed(futures):
+                status, msg = fut.result()
+                print(msg)
+                if status == "BROWSER":
+                    deferred.append(futures[fut])
+                else:
+                    counts[status] += 1
+
+        # 第二輪：只有少數網址需要開瀏覽器
+        if deferred:
+            deferred.sort()
+            print(f"\n[INFO] 第二輪：{len(deferred)}/{total} 筆改用瀏覽器（{BROWSER_WORKERS} 個分頁）")
+            handled = set()
+            begin_claim_round([idx for idx, _, _ in deferred])
+            try:
+                asyncio.run(render_deferred(s, deferred, total, counts, handled, img_cache, ledger, cpu_pool))
             except Exception as e:
-                print(f"[ERR] ({idx}/{len(items)}) {url}\n      {e}")
-                fail += 1
-                continue
-
-    print(f"\n[DONE] OK={ok}, SKIP={skip}, FAIL={fail}")
+                # 瀏覽器開不起來（例如沒跑過 playwright install）→ 剩下的照舊用 requests 抓到的內容
+                print(f"[WARN] 瀏覽器無法使用，改用 requests 的版本：{type(e).__name__}: {e}")
+                for idx, url, name_from_csv in deferred:
+                    if idx not in handled:
+                        status, msg = process_one(s, idx, total, url, name_from_csv, img_cache, ledger, cpu_pool)
+                        counts[status] += 1
+                        print(msg)
+
+    if cpu_pool is not None:
+        cpu_pool.shutdown()
+    img_cache.close()
+
+    print(f"\n[DONE] OK={counts['OK']}, SKIP={counts['SKIP']}, FAIL={counts['FAIL']}")
+    print(f"[INFO] 紀錄檔累計：{ledger.counts()}")
+    ledger.close()
 
 
 if __name__ == "__main__":
@@ -1,15 +1,38 @@
 import os
 import re
-import time
-from urllib.parse import urljoin
+import json
+import asyncio
+from urllib.parse import urljoin, urlparse
 
 import requests
 from bs4 import BeautifulSoup
-import pandas as pd
+
+import html_backend
+import http_client
+import inventory_sink
+import site_feeds
+from inventory_sink import COLUMNS
 
 
 OUT_DIR = r"F:\F\AI"
-SLEEP_SEC = 0.8  # 爬取間隔
+SLEEP_SEC = 0.8  # 爬取間隔（換算成每秒請求數給限速器當起始速度，出錯會自動放慢）
+PARSER_BACKEND = "bs4"  # "bs4" = BeautifulSoup（參考版）；"lxml" = 直接用 lxml（快）
+OUTPUT_FORMAT = "xlsx"  # "xlsx" / "csv" / "jsonl"：邊爬邊寫，中途當掉已抓到的會留在 .part 檔
+
+# ===== 分頁並行（async）=====
+CRAWL_MODE = "async"     # "async" = 認出分頁網址規則就同時抓多頁；"serial" = 一頁一頁跟著下一頁走
+ASYNC_WORKERS = 8        # 同時抓幾頁
+ASYNC_MAX_RATE = 5.0     # async 模式每秒最多幾個請求（限速器會從 1/SLEEP_SEC 慢慢加到這裡，出錯就減半）
+EMPTY_PAGES_STOP = 2     # 連續幾頁沒有新文章就當作到底了
+
+# ===== 增量更新 =====
+INCREMENTAL = True       # True = 讀上次的總表，從最新一頁往後抓，碰到整頁都是已知文章就停
+PREV_INVENTORY = None    # 上次的總表（.xlsx / .csv / .jsonl / .json，例如 pixnet_posts.json）；None = 用這次要輸出的檔
+
+# ===== sitemap / RSS 快速路徑 =====
+FEED_FIRST = True        # True = 先找 sitemap.xml / RSS / Atom，拿不到完整清單才一頁一頁爬 HTML
+FEED_URL_FILTER = None   # 只留符合這個正規式的網址（例如 r"/blog/posts/\d+"，濾掉分類頁、標籤頁）；None = 照第一頁列表的文章網址自動推
+SITEMAP_TITLE_FETCH = 50 # sitemap 沒標題、RSS 也補不到的，最多幾篇去抓文章頁的 <title>；更多就改爬列表頁（比較省）
 
 
 def safe_filename(name: str, max_len: int = 120) -> str:
@@ -22,12 +45,17 @@ def safe_filename(name: str, max_len: int = 120) -> str:
 
 
 def fetch_soup(session: requests.Session, url: str) -> BeautifulSoup:
-    r = session.get(url, timeout=30)
+    r = http_client.get(session, url, timeout=30)
     r.raise_for_status()
+    if PARSER_BACKEND == "lxml":
+        return html_backend.parse(r.text)
     return BeautifulSoup(r.text, "html.parser")
 
 
 def extract_posts(soup: BeautifulSoup):
+    if html_backend.is_lxml(soup):
+        return html_backend.extract_posts(soup)
+
     rows = []
 
     articles = soup.select("article")
@@ -63,7 +91,25 @@ def extract_posts(soup: BeautifulSoup):
     return list(uniq.values())
 
 
+def _url_key(url: str) -> str:
+    # 比對網址用：不管 http / https、結尾的 /
+    u = urlparse(url)
+    return u.netloc.lower() + u.path.rstrip("/")
+
+
+def page_posts(soup, page_url: str):
+    """extract_posts + 網址換成絕對網址（列表頁、sitemap、RSS、上次的總表都用同一種網址，才比對得起來）"""
+    uniq = {}
+    for r in extract_posts(soup):
+        r = dict(r, 網址=urljoin(page_url, r["網址"]))
+        uniq[_url_key(r["網址"])] = r
+    return list(uniq.values())
+
+
 def find_next_page(soup: BeautifulSoup, current_url: str):
+    if html_backend.is_lxml(soup):
+        return html_backend.find_next_page(soup, current_url)
+
     a = soup.select_one('a[rel="next"]')
     if a and a.get("href"):
         return urljoin(current_url, a["href"])
@@ -74,6 +120,210 @@ def find_next_page(soup: BeautifulSoup, current_url: str):
     return None
 
 
+# =========================
+# 分頁網址規則：?page=N / /page/N
+# =========================
+PAGE_PATTERNS = [
+    re.compile(r"([?&](?:page|paged|p)=)(\d+)"),
+    re.compile(r"(/page/)(\d+)"),
+]
+
+
+def detect_page_pattern(next_url: str):
+    """從第 2 頁的網址認出分頁規則；回傳 (page_url(n) 函式, 這頁的頁碼)，認不出來回 None"""
+    if not next_url:
+        return None
+    for pat in PAGE_PATTERNS:
+        m = None
+        for m in pat.finditer(next_url):
+            pass
+        if m is None:
+            continue
+        head, tail = next_url[:m.start(2)], next_url[m.end(2):]
+        return (lambda n: f"{head}{n}{tail}"), int(m.group(2))
+    return None
+
+
+def fetch_soup_or_none(session: requests.Session, url: str):
+    """超過最後一頁常常是 404：當成空頁，不當錯誤"""
+    try:
+        return fetch_soup(session, url)
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return None
+        raise
+
+
+async def crawl_pages_async(session: requests.Session, page_url, first_page: int, emit, known_links=()):
+    """從 first_page 開始一次抓 ASYNC_WORKERS 頁，依頁碼順序交給 emit(rows)；連續 EMPTY_PAGES_STOP 頁沒新文章就停
+    known_links：已經有的網址（_url_key）"""
+    sem = asyncio.Semaphore(ASYNC_WORKERS)
+    seen_links = set(known_links)
+    total = 0
+    empty_run = 0
+    n = first_page
+
+    async def fetch(num):
+        async with sem:
+            soup = await asyncio.to_thread(fetch_soup_or_none, session, page_url(num))
+        return [] if soup is None else page_posts(soup, page_url(num))
+
+    while True:
+        nums = list(range(n, n + ASYNC_WORKERS))
+        results = await asyncio.gather(*(fetch(num) for num in nums))
+        n += ASYNC_WORKERS
+
+        for num, rows in zip(nums, results):
+            # 有些站超過最後一頁會一直回最後一頁 → 沒有新網址也算空頁
+            new_rows = [r for r in rows if _url_key(r["網址"]) not in seen_links]
+            if not new_rows:
+                empty_run += 1
+                if empty_run >= EMPTY_PAGES_STOP:
+                    print(f"[INFO] 到第 {num} 頁已連續 {empty_run} 頁沒有新文章，停止")
+                    return
+                continue
+            empty_run = 0
+            seen_links.update(_url_key(r["網址"]) for r in new_rows)
+            total += len(new_rows)
+            emit(new_rows)
+        print(f"[INFO] 已抓到第 {n - 1} 頁，目前 {total} 筆")
+
+
+def all_known(rows, known: set) -> bool:
+    """known 是 _url_key 的集合"""
+    return bool(rows) and all(_url_key(r["網址"]) in known for r in rows)
+
+
+def crawl_serial(session: requests.Session, url: str, seen: set, emit, known: set = None):
+    """原本的做法：跟著「下一頁」一頁一頁走，每頁交給 emit(rows)；有 known 時碰到整頁都是已知文章就停"""
+    while url and url not in seen:
+        seen.add(url)
+        soup = fetch_soup(session, url)
+        page_rows = page_posts(soup, url)
+        emit(page_rows)
+        if known and all_known(page_rows, known):
+            print(f"[INFO] {url} 整頁都是已知文章，停止")
+            break
+        url = find_next_page(soup, url)
+
+
+# =========================
+# 上次的總表（增量更新用）
+# =========================
+def fill_blanks(row, old):
+    """同一個網址以新抓到的為準，但新的空白欄位沿用舊的"""
+    return {c: row[c] or old[c] for c in COLUMNS} if old else row
+
+
+def save_json_atomic(rows, path: str):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def crawl_html(session: requests.Session, start_url: str, first_soup, known: set, emit):
+    """一頁一頁（或認出分頁規則後並行）爬列表頁，每頁交給 emit(rows)"""
+    first_rows = page_posts(first_soup, start_url)
+    emit(first_rows)
+    next_url = find_next_page(first_soup, start_url)
+    pattern = detect_page_pattern(next_url) if CRAWL_MODE == "async" and not known else None
+
+    if known:
+        # 新文章只會在最前面幾頁 → 一頁一頁抓就好
+        if not all_known(first_rows, known):
+            crawl_serial(session, next_url, {start_url}, emit, known)
+    elif pattern:
+        page_url, second = pattern
+        print(f"[INFO] 分頁規則：{page_url('N')}，同時抓 {ASYNC_WORKERS} 頁")
+        asyncio.run(crawl_pages_async(session, page_url, second, emit, [_url_key(r["網址"]) for r in first_rows]))
+    else:
+        if CRAWL_MODE == "async" and next_url:
+            print("[WARN] 認不出分頁網址規則，改成一頁一頁抓")
+        crawl_serial(session, next_url, {start_url}, emit)
+
+
+def post_url_pattern(rows):
+    """
+    從列表頁的文章網址推出「文章網址」的正規式：路徑層數要一樣，
+    每層大家都一樣的照抄、不一樣的（還有最後一層）當成變數；推不出來回 None
+    例：/blog/post-1、/blog/post-2 → /blog/[^/]+（/tag/foo、/blog/page/2 都不符合）
+    """
+    groups = {}
+    for r in rows:
+        segs = urlparse(r["網址"]).path.strip("/").split("/")
+        if segs != [""]:
+            groups.setdefault(len(segs), []).append(segs)
+    alts = set()
+    for n, group in groups.items():
+        parts = []
+        for i in range(n):
+            vals = {g[i] for g in group}
+            parts.append(re.escape(vals.pop()) if i < n - 1 and len(vals) == 1 else "[^/]+")
+        alts.add("/" + "/".join(parts) + "/?")
+    if not alts:
+        return None
+    return r"^https?://[^/]+(?:" + "|".join(sorted(alts)) + r")(?:[?#].*)?$"
+
+
+def fill_titles(session: requests.Session, rows):
+    """沒有標題的去抓文章頁的 <title>（日期留空，之後給 抓日期.py 補）"""
+    for i, r in enumerate(rows, 1):
+        soup = fetch_soup_or_none(session, r["網址"])
+        if soup is None:
+            continue
+        if html_backend.is_lxml(soup):
+            r["名稱"] = html_backend.page_title(soup) or ""
+        else:
+            r["名稱"] = soup.title.get_text(strip=True) if soup.title else ""
+        if i % 10 == 0:
+            print(f"[INFO] 補標題 {i}/{len(rows)}")
+
+
+def crawl_feeds(session: requests.Session, start_url: str, first_soup, known: set):
+    """sitemap / RSS 快速路徑；清單不完整（要退回爬 HTML）回 None。known 是 _url_key 的集合"""
+    first_rows = page_posts(first_soup, start_url)
+    url_filter = FEED_URL_FILTER or post_url_pattern(first_rows)
+    sitemap_rows, feed_rows = site_feeds.collect(session, start_url, first_soup, url_filter)
+
+    # sitemap 是全站清單（標籤頁、分類頁、關於我…都在裡面）→ 只有確定篩得出文章才用
+    if sitemap_rows and url_filter is None:
+        print("[INFO] 第一頁看不出文章網址的樣子，也沒設 FEED_URL_FILTER → 不用 sitemap")
+        sitemap_rows = []
+    if sitemap_rows:
+        listed = {_url_key(r["網址"]) for r in sitemap_rows}
+        missing = [r for r in first_rows if _url_key(r["網址"]) not in listed]
+        if missing:
+            print(f"[INFO] sitemap 沒有列出第一頁的文章（例如 {missing[0]['網址']}）→ 不用 sitemap")
+            sitemap_rows = []
+
+    if sitemap_rows:
+        # sitemap 只有網址：標題、發文日期用列表第一頁和 RSS 的（sitemap 的 lastmod 是最後修改日，不當日期）
+        by_key = {_url_key(r["網址"]): r for r in first_rows + feed_rows}
+        rows = [fill_blanks(r, by_key.get(_url_key(r["網址"]))) for r in sitemap_rows]
+        no_title = [r for r in rows if not r["名稱"] and _url_key(r["網址"]) not in known]
+        if len(no_title) > SITEMAP_TITLE_FETCH:
+            print(f"[INFO] sitemap 有 {len(no_title)} 篇沒有標題（超過 {SITEMAP_TITLE_FETCH}）→ 改爬列表頁")
+            return None
+        if no_title:
+            print(f"[INFO] sitemap 有 {len(no_title)} 篇沒有標題，去文章頁補")
+            fill_titles(session, no_title)
+        # 日期格式不一（列表頁的 2024-05-01 / 2024/5/1、RSS 換過的、空白）→ 換成 yyyymmdd 再排；
+        # 沒日期的排後面，保持 sitemap 的順序（sort 是穩定的）
+        rows.sort(key=lambda r: html_backend._parse_date_to_yyyymmdd(r["日期"]) or "", reverse=True)
+        no_date = sum(1 for r in rows if not r["日期"])
+        print(f"[OK]  sitemap：{len(rows)} 筆" + (f"（{no_date} 筆沒有日期，用 抓日期.py 補）" if no_date else ""))
+        return rows
+
+    if feed_rows and known and any(_url_key(r["網址"]) in known for r in feed_rows):
+        # RSS 只有最新幾十篇，但已經接上上次的總表 → 夠了
+        print(f"[OK]  RSS/Atom：{len(feed_rows)} 筆（已接上上次的總表）")
+        return feed_rows
+
+    print("[INFO] 沒有可用的 sitemap、RSS 也不完整 → 改爬列表頁")
+    return None
+
+
 def main():
     start_url = input("請輸入要爬取的 EZQuant Blog 網址：\n").strip()
     if not start_url:
@@ -82,41 +332,61 @@ def main():
 
     os.makedirs(OUT_DIR, exist_ok=True)
 
-    with requests.Session() as s:
-        s.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-        })
+    if CRAWL_MODE == "async":
+        http_client.configure(rate=1 / SLEEP_SEC, burst=1, max_rate=ASYNC_MAX_RATE,
+                              per_host_limit=ASYNC_WORKERS)
+    else:
+        http_client.configure(rate=1 / SLEEP_SEC, burst=1, max_rate=1 / SLEEP_SEC)
+    with http_client.make_session(headers={
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+    }, pool_maxsize=ASYNC_WORKERS) as s:
 
         first_soup = fetch_soup(s, start_url)
 
-        page_title = first_soup.title.get_text(strip=True) if first_soup.title else "blog"
-        file_name = safe_filename(page_title) + ".xlsx"
+        if html_backend.is_lxml(first_soup):
+            page_title = html_backend.page_title(first_soup)
+        else:
+            page_title = first_soup.title.get_text(strip=True) if first_soup.title else None
+        if page_title is None:
+            page_title = "blog"
+        file_name = safe_filename(page_title) + "." + OUTPUT_FORMAT
         out_path = os.path.join(OUT_DIR, file_name)
 
-        all_rows = []
-        url = start_url
-        seen = set()
-
-        while url and url not in seen:
-            seen.add(url)
-            soup = first_soup if url == start_url else fetch_soup(s, url)
-
-            all_rows.extend(extract_posts(soup))
-            url = find_next_page(soup, url)
-
-            time.sleep(SLEEP_SEC)
-
-        uniq = {}
-        for r in all_rows:
-            uniq[r["網址"]] = r
-
-        df = pd.DataFrame(
-            uniq.values(),
-            columns=["日期", "名稱", "網址"]
-        )
-
-        df.to_excel(out_path, index=False)
-        print(f"✅ 完成，共 {len(df)} 筆")
+        prev_path = PREV_INVENTORY or out_path
+        # 舊總表可能是舊版存的相對網址 → 一樣換成絕對網址；比對一律用 _url_key（不管 http / https、結尾的 /）
+        prev_rows = inventory_sink.read_rows(prev_path) if INCREMENTAL else []
+        prev_rows = [dict(r, 網址=urljoin(start_url, r["網址"])) for r in prev_rows if r.get("網址")]
+        old_by_key = {_url_key(r["網址"]): r for r in prev_rows}
+        if old_by_key:
+            print(f"[INFO] 增量更新：上次的總表 {len(old_by_key)} 筆（{prev_path}）")
+
+        with inventory_sink.open_sink(out_path) as sink:
+            written = set()
+
+            def emit(rows):
+                # 抓到一頁寫一頁；同一個網址只留第一次出現的
+                for r in rows:
+                    key = _url_key(r["網址"])
+                    if key not in written:
+                        written.add(key)
+                        sink.write(fill_blanks(r, old_by_key.get(key)))
+
+            feed_rows = crawl_feeds(s, start_url, first_soup, old_by_key.keys()) if FEED_FIRST else None
+            if feed_rows is None:
+                crawl_html(s, start_url, first_soup, old_by_key.keys(), emit)
+            else:
+                emit(feed_rows)
+
+            new_count = len(written - old_by_key.keys())
+            emit(prev_rows)   # 舊的接在後面（已經寫過的網址自動略過）
+            total = sink.count
+
+        if old_by_key:
+            print(f"[INFO] 新文章 {new_count} 筆")
+            if prev_path.lower().endswith(".json"):
+                save_json_atomic(inventory_sink.read_rows(out_path), prev_path)
+
+        print(f"✅ 完成，共 {total} 筆")
         print(f"📄 輸出位置：{out_path}")
 
 
@@ -0,0 +1,241 @@
+# 檔名：Whisper_指定.py
+# Whisper_指定.bat 的 Python 版：整個目錄（含子目錄）的 mp4 / mp3 / m4a 轉成同名 .srt
+#   - 解碼（ffmpeg → 16kHz WAV）和辨識（whisper）同時進行：辨識這一個的時候，下一個已經在解碼
+#   - 辨識同時跑幾個、每個幾條執行緒，依 CPU 核心數自動決定（CPU 一直滿載，不會解碼時辨識閒著）
+#   - 已經有 .srt 的跳過；字幕先寫到暫存目錄，完成才搬過去（中途中斷不會留下半個 .srt 被當成已完成）
+#   - 每個檔案記錄即時率 RTF = 辨識秒數 / 音訊秒數（越小越快），寫進目錄裡的 _whisper_report.jsonl
+#   - 辨識器可以換：預設 whisper.cpp（main.exe）；--stub 用假的辨識器（不用模型，測流程用）
+#
+# 用法：python Whisper_指定.py [目錄] [--stub]   （沒給目錄就跟 .bat 一樣問，直接 Enter 用預設）
+import os
+import sys
+import json
+import time
+import queue
+import wave
+import shutil
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+import media_probe
+
+# ===== 工具路徑（找不到就用 PATH 裡的） =====
+WHISPER = r"C:\_install\Whispertool\main.exe"
+MODEL = r"C:\_install\Whispertool\ggml-medium.bin"
+FFMPEG = r"C:\_install\Whispertool\ffmpeg.exe"
+
+# ===== 設定 =====
+DEFAULT_DIR = r"f:\F\AI\downloads"
+LANGUAGE = "zh"
+MEDIA_EXTS = (".mp4", ".mp3", ".m4a")
+RECOGNIZER_WORKERS = 0            # 同時辨識幾個檔（0 = 自動）
+RECOGNIZER_THREADS = 0            # 每個辨識用幾條執行緒（0 = 自動）
+MAX_THREADS_PER_RECOGNIZER = 8    # whisper.cpp 超過 8 條執行緒幾乎不會再變快，不如多開一個
+MAX_RECOGNIZERS = 2               # medium 模型一個約吃 2GB 記憶體，最多同時幾個
+DECODE_AHEAD = 2                  # 最多先解碼好幾個 WAV 等著（暫存空間 = 這個數 x 一個 WAV）
+REPORT_NAME = "_whisper_report.jsonl"   # 每個檔案的耗時 / RTF 紀錄（放在處理的目錄裡）
+
+
+def _exe(path: str, name: str) -> str:
+    return path if os.path.isfile(path) else name
+
+
+# =========================
+# 辨識器（可替換）
+# =========================
+class WhisperCppRecognizer:
+    """whisper.cpp 的 main.exe：recognize(wav, out_base, threads) → 產生 out_base.srt"""
+
+    def __init__(self, exe: str = WHISPER, model: str = MODEL, language: str = LANGUAGE):
+        self.exe = _exe(exe, "whisper-cli")
+        self.model = model
+        self.language = language
+
+    def recognize(self, wav: Path, out_base: Path, threads: int) -> Path:
+        cmd = [
+            self.exe,
+            "-m", self.model,
+            "-l", self.language,
+            "-t", str(threads),
+            "-osrt",
+            "-of", str(out_base),   # 輸出檔名（不含副檔名）；沒給的話會變成 xxx.wav.srt
+            "-f", str(wav),
+        ]
+        r = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        srt = out_base.with_suffix(".srt")
+        if r.returncode != 0 or not srt.exists():
+            err = r.stderr.decode("utf-8", errors="replace").strip().splitlines()
+            raise RuntimeError(f"whisper 失敗（{r.returncode}）：{err[-1] if err else '沒有輸出 .srt'}")
+        return srt
+
+
+class StubRecognizer:
+    """假的辨識器：照音訊長度睡一下（rtf 倍），寫出一條字幕；測試流程、不用裝模型"""
+
+    def __init__(self, rtf: float = 0.01):
+        self.rtf = rtf
+
+    def recognize(self, wav: Path, out_base: Path, threads: int) -> Path:
+        with wave.open(str(wav), "rb") as w:
+            sec = w.getnframes() / float(w.getframerate() or 16000)
+        time.sleep(sec * self.rtf)
+        end_ms = int(sec * 1000)
+        h, m, s, ms = end_ms // 3600000, end_ms // 60000 % 60, end_ms // 1000 % 60, end_ms % 1000
+        srt = out_base.with_suffix(".srt")
+        srt.write_text(f"1\n00:00:00,000 --> {h:02}:{m:02}:{s:02},{ms:03}\n(stub)\n",
+                       encoding="utf-8")
+        return srt
+
+
+# =========================
+# 工具
+# =========================
+def plan_concurrency(cores: int):
+    """回傳 (同時辨識幾個, 每個幾條執行緒)；核心多的時候留一個給 ffmpeg 解碼"""
+    usable = cores - 1 if cores > 4 else cores
+    usable = max(1, usable)
+    workers = RECOGNIZER_WORKERS or min(MAX_RECOGNIZERS, -(-usable // MAX_THREADS_PER_RECOGNIZER))
+    threads = RECOGNIZER_THREADS or max(1, min(MAX_THREADS_PER_RECOGNIZER, usable // workers))
+    return workers, threads
+
+
+def find_media(root: Path):
+    """root 底下（含子目錄）所有要辨識的檔 → (要做的, 已有 .srt 跳過的)"""
+    todo, skipped = [], []
+    for p in sorted(root.rglob("*")):
+        if not p.is_file() or p.suffix.lower() not in MEDIA_EXTS:
+            continue
+        (skipped if p.with_suffix(".srt").exists() else todo).append(p)
+    return todo, skipped
+
+
+def decode_wav(src: Path, wav: Path):
+    cmd = [
+        _exe(FFMPEG, "ffmpeg"), "-y", "-v", "error",
+        "-i", str(src),
+        "-ar", "16000", "-ac", "1", "-c:a", "pcm_s16le",
+        str(wav)
+    ]
+    r = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if r.returncode != 0:
+        err = r.stderr.decode("utf-8", errors="replace").strip().splitlines()
+        raise RuntimeError(f"ffmpeg 解碼失敗：{err[-1] if err else r.returncode}")
+
+
+def audio_seconds(src: Path, wav: Path) -> float:
+    try:
+        return media_probe.duration(src)
+    except Exception:
+        # 探測不到就用 WAV 大小算（16kHz、單聲道、16-bit = 每秒 32000 bytes）
+        return max(0.0, (wav.stat().st_size - 44) / 32000)
+
+
+# =========================
+# 主流程
+# =========================
+def transcribe_dir(root: Path, recognizer=None):
+    recognizer = recognizer or WhisperCppRecognizer()
+    todo, skipped = find_media(root)
+    for p in skipped:
+        print(f"[SKIP] 已存在：{p.with_suffix('.srt')}")
+
+    workers, threads = plan_concurrency(os.cpu_count() or 4)
+    print(f"[INFO] 要辨識 {len(todo)} 個 | 跳過 {len(skipped)} 個 | 同時辨識 {workers} 個 x {threads} 執行緒"
+          f" | 先解碼 {DECODE_AHEAD} 個 | 辨識器：{type(recognizer).__name__}")
+    if not todo:
+        return
+
+    report_path = root / REPORT_NAME
+    report_lock = threading.Lock()
+    counts = {"OK": 0, "ERR": 0}
+    totals = {"audio": 0.0}
+    ready = queue.Queue(maxsize=DECODE_AHEAD)   # 解碼好的 (序號, 原檔, WAV, 解碼秒數)
+    t_start = time.perf_counter()
+
+    def record(status: str, idx: int, src: Path, msg: str, row: dict = None):
+        with report_lock:
+            counts[status] += 1
+            print(f"[{status}] ({idx}/{len(todo)}) {src.name} | {msg}")
+            if row is not None:
+                with open(report_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def recognize_loop(td: Path):
+        while True:
+            job = ready.get()
+            if job is None:
+                return
+            idx, src, wav, t_decode = job
+            try:
+                audio = audio_seconds(src, wav)
+                t0 = time.perf_counter()
+                tmp_srt = recognizer.recognize(wav, td / f"{idx:05d}", threads)
+                t_rec = time.perf_counter() - t0
+                shutil.move(str(tmp_srt), str(src.with_suffix(".srt")))
+                rtf = t_rec / audio if audio > 0 else 0.0
+                with report_lock:
+                    totals["audio"] += audio
+                record("OK", idx, src, f"音訊 {audio:.1f}s | 解碼 {t_decode:.1f}s | 辨識 {t_rec:.1f}s | RTF {rtf:.2f}", {
+                    "file": str(src), "audio_sec": round(audio, 2), "decode_sec": round(t_decode, 2),
+                    "recognize_sec": round(t_rec, 2), "rtf": round(rtf, 3), "threads": threads,
+                    "recognizer": type(recognizer).__name__, "finished_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                })
+            except Exception as e:
+                record("ERR", idx, src, str(e))
+            finally:
+                wav.unlink(missing_ok=True)
+
+    with tempfile.TemporaryDirectory(prefix="whisper_") as td:
+        td = Path(td)
+        pool = [threading.Thread(target=recognize_loop, args=(td,), daemon=True) for _ in range(workers)]
+        for t in pool:
+            t.start()
+
+        # 這條（主執行緒）負責解碼；佇列滿了就等辨識消化（WAV 不會堆滿暫存目錄）
+        for idx, src in enumerate(todo, 1):
+            wav = td / f"{idx:05d}.wav"
+            t0 = time.perf_counter()
+            try:
+                decode_wav(src, wav)
+            except Exception as e:
+                wav.unlink(missing_ok=True)
+                record("ERR", idx, src, str(e))
+                continue
+            ready.put((idx, src, wav, time.perf_counter() - t0))
+
+        for _ in pool:
+            ready.put(None)
+        for t in pool:
+            t.join()
+
+    wall = time.perf_counter() - t_start
+    speed = totals["audio"] / wall if wall > 0 else 0.0
+    print(f"\n[DONE] 完成 {counts['OK']} | 失敗 {counts['ERR']} | 跳過 {len(skipped)} | "
+          f"音訊共 {totals['audio'] / 60:.1f} 分鐘 | 花了 {wall / 60:.1f} 分鐘（{speed:.1f} 倍速）")
+    print(f"[OK]  紀錄：{report_path}")
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if args:
+        root_in = args[0]
+    else:
+        print("===================================================")
+        print("請輸入要辨識的目錄（可直接拖曳資料夾進來）")
+        print(f"直接按 Enter 使用預設：{DEFAULT_DIR}")
+        print("===================================================")
+        root_in = input("> ").strip()
+    root = Path((root_in or DEFAULT_DIR).strip('"')).resolve()
+    if not root.is_dir():
+        print(f"[ERR] 找不到目錄：{root}")
+        sys.exit(1)
+
+    print(f"\n處理目錄：{root}")
+    recognizer = StubRecognizer() if "--stub" in sys.argv else WhisperCppRecognizer()
+    transcribe_dir(root, recognizer)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# 檔名：bench_pick_content_root.py
+# 比較 pick_content_root 新舊兩版：
+#   - 舊版：每個候選各自 get_text + find_all（pick_content_root_slow）
+#   - 新版：整棵樹走一次算好統計再查表（pick_content_root）
+# 會檢查兩版每個候選的分數、選出的節點是否完全一樣，並印出耗時。
+#
+# 用法：python bench_pick_content_root.py [存 HTML 的資料夾]
+#   資料夾預設用批次版的網頁快取（_html_cache，*.body），也吃 _debug 裡的 *.html
+#       python bench_pick_content_root.py --fixtures
+#   只跑 html_fixtures.py 裡寫死的小頁面（不用任何外部檔案；改完 pick_content_root 先跑這個）
+#   有不一致就以 exit code 1 結束
+import os
+import sys
+import time
+import importlib.util
+
+from bs4 import BeautifulSoup
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BATCH_SCRIPT = os.path.join(HERE, "P爬文章批次轉成docx_痞客邦 .py")
+REPEAT = 3
+
+
+def load_batch_module():
+    # 檔名有空白，只能用 importlib 載入
+    spec = importlib.util.spec_from_file_location("batch_docx", BATCH_SCRIPT)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def iter_saved_pages(folder: str):
+    for dirpath, _, files in os.walk(folder):
+        for fn in sorted(files):
+            if fn.lower().endswith((".html", ".htm", ".body")):
+                yield os.path.join(dirpath, fn)
+
+
+def read_html(path: str) -> str:
+    with open(path, "rb") as f:
+        raw = f.read()
+    for enc in ("utf-8", "cp950", "big5"):
+        try:
+            return raw.decode(enc)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("utf-8", errors="replace")
+
+
+def check_page(mod, name: str, html: str):
+    """一頁：檢查候選名單、每個候選分數、選出的節點；回傳 (不一致處數, 舊版秒數, 新版秒數)"""
+    mismatch = 0
+    soup = BeautifulSoup(html, "lxml")
+
+    # 1) 正確性：候選名單、每個候選分數都要一樣
+    stats = mod.compute_subtree_stats(soup)
+    cands = mod._content_root_candidates(soup)
+    if [id(n) for n in cands] != [id(n) for n in mod._content_root_candidates_select(soup)]:
+        mismatch += 1
+        print(f"[DIFF] {name} 候選名單不同")
+    for node in cands:
+        a = mod._node_score(node)
+        b = mod._node_score_from_stats(node, stats[id(node)])
+        if a != b:
+            mismatch += 1
+            print(f"[DIFF] {name} <{node.name}> 舊={a} 新={b}")
+
+    # 2) 耗時
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        slow = mod.pick_content_root_slow(soup)
+    t1 = time.perf_counter()
+    for _ in range(REPEAT):
+        fast = mod.pick_content_root(soup)
+    t2 = time.perf_counter()
+
+    if slow is not fast:
+        mismatch += 1
+        print(f"[DIFF] {name} 選到不同節點：舊=<{slow.name}> 新=<{fast.name}>")
+    return mismatch, t1 - t0, t2 - t1
+
+
+def main():
+    mod = load_batch_module()
+    if "--fixtures" in sys.argv:
+        import html_fixtures
+        pages = list(html_fixtures.FIXTURES.items())
+        source = "html_fixtures.py"
+    else:
+        args = [a for a in sys.argv[1:] if not a.startswith("--")]
+        folder = args[0] if args else mod.HTML_CACHE_DIR
+        pages = [(os.path.basename(p), read_html(p)) for p in iter_saved_pages(folder)]
+        source = folder
+    if not pages:
+        print(f"[WARN] 找不到任何存下來的頁面：{source}")
+        return
+
+    print(f"[INFO] 頁面數：{len(pages)}（{source}，每頁各跑 {REPEAT} 次）")
+    t_slow = t_fast = 0.0
+    mismatch = 0
+
+    for name, html in pages:
+        m, ts, tf = check_page(mod, name, html)
+        mismatch += m
+        t_slow += ts
+        t_fast += tf
+
+    print(f"\n[DONE] 舊版 {t_slow:.3f}s | 新版 {t_fast:.3f}s | 加速 x{t_slow / max(t_fast, 1e-9):.1f}")
+    print("[OK]  兩版結果完全一致" if mismatch == 0 else f"[ERR] 不一致 {mismatch} 處")
+    sys.exit(1 if mismatch else 0)
+
+
+if __name__ == "__main__":
+    main()
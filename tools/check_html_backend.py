@@ -0,0 +1,139 @@
+# 檔名：check_html_backend.py
+# 一致性檢查：html_backend（lxml 快速版）vs BeautifulSoup（參考版）
+#   - 批次 docx：標題、日期、pick_content_root + iter_content_blocks 產生的區塊要完全一樣
+#   - 文章總表：extract_posts、find_next_page 要完全一樣
+# 全部一致才建議把腳本的 PARSER_BACKEND 改成 "lxml"。
+#
+# 用法：python check_html_backend.py [存 HTML 的資料夾]
+#   預設用批次版的網頁快取（_html_cache，*.body），也吃 _debug 裡的 *.html
+#       python check_html_backend.py --fixtures
+#   只跑 html_fixtures.py 裡寫死的小頁面（不用任何外部檔案；改完 html_backend 先跑這個）
+import os
+import sys
+import time
+import importlib.util
+
+from bs4 import BeautifulSoup
+
+import html_backend
+from bench_pick_content_root import iter_saved_pages, read_html
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BATCH_SCRIPT = os.path.join(HERE, "P爬文章批次轉成docx_痞客邦 .py")
+LIST_SCRIPT = os.path.join(HERE, "P爬網站的文章總表.py")
+BASE_URL = "https://example.com/blog/"
+
+
+def load_script(name: str, path: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def docx_view_bs4(batch, html: str):
+    soup = BeautifulSoup(html, "lxml")
+    title = soup.title.get_text(strip=True) if soup.title else None
+    date8 = batch.extract_date8(soup, html)
+    blocks = list(batch.iter_content_blocks(batch.pick_content_root(soup)))
+    return title, date8, blocks
+
+
+def docx_view_lxml(html: str):
+    root = html_backend.parse(html)
+    title = html_backend.page_title(root)
+    date8 = html_backend.extract_date8(root, html)
+    blocks = list(html_backend.iter_content_blocks(html_backend.pick_content_root(root)))
+    return title, date8, blocks
+
+
+def list_view_bs4(listing, html: str, features: str):
+    soup = BeautifulSoup(html, features)
+    return listing.extract_posts(soup), listing.find_next_page(soup, BASE_URL)
+
+
+def list_view_lxml(html: str):
+    root = html_backend.parse(html)
+    return html_backend.extract_posts(root), html_backend.find_next_page(root, BASE_URL)
+
+
+def first_diff(a, b):
+    for i, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            return f"第 {i} 筆：bs4={x!r} | lxml={y!r}"
+    return f"筆數不同：bs4={len(a)} | lxml={len(b)}"
+
+
+def check_page(batch, listing, name: str, html: str):
+    """一頁：回傳 (不一致處數, html.parser 結果不同?, bs4 秒數, lxml 秒數)"""
+    fail = 0
+    t0 = time.perf_counter()
+    ref = docx_view_bs4(batch, html)
+    t1 = time.perf_counter()
+    got = docx_view_lxml(html)
+    t2 = time.perf_counter()
+
+    for label, x, y in zip(("標題", "日期"), ref[:2], got[:2]):
+        if x != y:
+            fail += 1
+            print(f"[DIFF] {name} {label}：bs4={x!r} | lxml={y!r}")
+    if ref[2] != got[2]:
+        fail += 1
+        print(f"[DIFF] {name} 正文區塊 {first_diff(ref[2], got[2])}")
+
+    # 文章總表：邏輯要跟 bs4(lxml 解析器) 完全一樣
+    ref_posts, ref_next = list_view_bs4(listing, html, "lxml")
+    got_posts, got_next = list_view_lxml(html)
+    if ref_posts != got_posts:
+        fail += 1
+        print(f"[DIFF] {name} extract_posts {first_diff(ref_posts, got_posts)}")
+    if ref_next != got_next:
+        fail += 1
+        print(f"[DIFF] {name} find_next_page：bs4={ref_next!r} | lxml={got_next!r}")
+
+    # 總表腳本原本用 html.parser，解析器不同 → 只提醒，不算失敗
+    hp_posts, hp_next = list_view_bs4(listing, html, "html.parser")
+    parser_warn = hp_posts != got_posts or hp_next != got_next
+    if parser_warn:
+        print(f"[WARN] {name} html.parser 解析出來的文章列表跟 lxml 不同（HTML 不規範）")
+    return fail, parser_warn, t1 - t0, t2 - t1
+
+
+def main():
+    batch = load_script("batch_docx", BATCH_SCRIPT)
+    listing = load_script("site_listing", LIST_SCRIPT)
+
+    if "--fixtures" in sys.argv:
+        import html_fixtures
+        pages = list(html_fixtures.FIXTURES.items())
+        source = "html_fixtures.py"
+    else:
+        args = [a for a in sys.argv[1:] if not a.startswith("--")]
+        folder = args[0] if args else batch.HTML_CACHE_DIR
+        pages = [(os.path.basename(p), read_html(p)) for p in iter_saved_pages(folder)]
+        source = folder
+    if not pages:
+        print(f"[WARN] 找不到任何存下來的頁面：{source}")
+        return
+
+    print(f"[INFO] 頁面數：{len(pages)}（{source}）")
+    fail = 0
+    parser_warn = 0
+    t_bs4 = t_lxml = 0.0
+
+    for name, html in pages:
+        f, w, tb, tl = check_page(batch, listing, name, html)
+        fail += f
+        parser_warn += w
+        t_bs4 += tb
+        t_lxml += tl
+
+    print(f"\n[DONE] bs4 {t_bs4:.3f}s | lxml {t_lxml:.3f}s | 加速 x{t_bs4 / max(t_lxml, 1e-9):.1f}")
+    if parser_warn:
+        print(f"[WARN] {parser_warn} 頁 html.parser 跟 lxml 解析結果不同")
+    print("[OK]  兩個後端輸出完全一致" if fail == 0 else f"[ERR] 不一致 {fail} 處")
+    sys.exit(1 if fail else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+# 檔名：html_backend.py
+# 快速解析後端：直接用 lxml.etree（不經過 BeautifulSoup），給大量批次跑用。
+#
+# 這裡的函式跟各腳本裡 BeautifulSoup 版（參考版）邏輯一一對應，輸出要完全一樣：
+#   page_title / extract_date8 / pick_content_root / iter_content_blocks  → P爬文章批次轉成docx_痞客邦 .py
+#   extract_posts / find_next_page                                      → P爬網站的文章總表.py
+# 有沒有一樣用 check_html_backend.py 對存下來的頁面比對。
+#
+# 腳本裡設定 PARSER_BACKEND = "lxml" 就會改走這裡；預設仍是 "bs4"。
+import re
+from datetime import datetime
+from urllib.parse import urljoin
+
+from lxml import etree
+
+BACKENDS = ("bs4", "lxml")
+
+# bs4 的 get_text() 不算這些 tag 裡面的字（Script / Stylesheet / TemplateString / Ruby 字串）
+_NO_TEXT_TAGS = {"script", "style", "template", "rt", "rp"}
+
+
+def parse(html: str):
+    """HTML 字串 → lxml 的 <html> 元素（解析器跟 BeautifulSoup(html, "lxml") 用的是同一個 libxml2）"""
+    parser = etree.HTMLParser(encoding="utf-8", strip_cdata=False)
+    root = etree.fromstring((html or "").encode("utf-8"), parser)
+    if root is None:
+        root = etree.fromstring(b"<html></html>", parser)
+    return root
+
+
+def is_lxml(tree) -> bool:
+    return isinstance(tree, etree._Element)
+
+
+# =========================
+# 文字：對應 bs4 的 get_text(sep, strip=True)
+# =========================
+def _iter_strings(el, skip=()):
+    """依文件順序產生 el 底下的文字節點；skip 裡的 tag 整棵跳過（但 tail 保留，跟 decompose 一樣）"""
+    excluded = any(a.tag in _NO_TEXT_TAGS for a in el.iterancestors())
+    stack = [(el, excluded)]
+    while stack:
+        node, ex = stack.pop()
+        if isinstance(node, str):
+            yield node
+            continue
+
+        ex = ex or node.tag in _NO_TEXT_TAGS
+        if node.text and not ex:
+            yield node.text
+
+        items = []
+        for c in node:
+            if isinstance(c.tag, str) and c.tag not in skip:
+                items.append((c, ex))
+            if c.tail and not ex:
+                items.append((c.tail, ex))
+        stack.extend(reversed(items))
+
+
+def get_text(el, sep: str = "", skip=()) -> str:
+    return sep.join(t for t in (s.strip() for s in _iter_strings(el, skip)) if t)
+
+
+def _iter_elements(root, skip=()):
+    """root 底下（不含自己）的元素，文件順序；skip 裡的 tag 整棵跳過"""
+    stack = [c for c in reversed(root) if isinstance(c.tag, str)]
+    while stack:
+        el = stack.pop()
+        if el.tag in skip:
+            continue
+        yield el
+        stack.extend(c for c in reversed(el) if isinstance(c.tag, str))
+
+
+def _classes(el):
+    return (el.get("class") or "").split()
+
+
+# =========================
+# 標題 / 日期
+# =========================
+def page_title(root):
+    """同 soup.title.get_text(strip=True)；沒有 <title> 回 None"""
+    t = next(root.iter("title"), None)
+    if t is None:
+        return None
+    return get_text(t)
+
+
+def _parse_date_to_yyyymmdd(s: str):
+    if not s:
+        return None
+    s = s.strip()
+
+    m = re.search(r"(20\d{2})-(\d{1,2})-(\d{1,2})", s)
+    if m:
+        y, mo, d = m.group(1), int(m.group(2)), int(m.group(3))
+        return f"{y}{mo:02d}{d:02d}"
+
+    m = re.search(r"(20\d{2})/(\d{1,2})/(\d{1,2})", s)
+    if m:
+        y, mo, d = m.group(1), int(m.group(2)), int(m.group(3))
+        return f"{y}{mo:02d}{d:02d}"
+
+    return None
+
+
+META_DATE_KEYS = [
+    ("property", "article:published_time"),
+    ("property", "og:published_time"),
+    ("name", "pubdate"),
+    ("name", "publishdate"),
+    ("name", "publish_date"),
+    ("name", "date"),
+    ("itemprop", "datePublished"),
+]
+
+
+def meta_date8(meta):
+    """<meta> 是發文日期的 meta（META_DATE_KEYS）就回 yyyymmdd，否則 None"""
+    if not meta.get("content"):
+        return None
+    if any(meta.get(attr) == val for attr, val in META_DATE_KEYS):
+        return _parse_date_to_yyyymmdd(meta.get("content"))
+    return None
+
+
+def time_date8(t):
+    return _parse_date_to_yyyymmdd(t.get("datetime") or get_text(t, " "))
+
+
+def find_date8(root, html: str):
+    """meta → <time> → 網頁裡第一個像日期的字串；都沒有回 None"""
+    metas = list(root.iter("meta"))
+    for attr, val in META_DATE_KEYS:
+        tag = next((m for m in metas if m.get(attr) == val), None)
+        if tag is not None and tag.get("content"):
+            d8 = _parse_date_to_yyyymmdd(tag.get("content"))
+            if d8:
+                return d8
+
+    t = next(root.iter("time"), None)
+    if t is not None:
+        d8 = time_date8(t)
+        if d8:
+            return d8
+
+    m = re.search(r"\b(20\d{2})[-/](\d{1,2})[-/](\d{1,2})\b", html)
+    if m:
+        y, mo, d = m.group(1), int(m.group(2)), int(m.group(3))
+        return f"{y}{mo:02d}{d:02d}"
+
+    return None
+
+
+def extract_date8(root, html: str) -> str:
+    """同批次版 extract_date8：找不到就用今天"""
+    return find_date8(root, html) or datetime.now().strftime("%Y%m%d")
+
+
+# =========================
+# 正文容器：同批次版 pick_content_root（單趟統計）
+# =========================
+CONTENT_ROOT_SELECTORS = [
+    "article",
+    "main",
+    ".vditor-reset",
+    ".markdown-body",
+    ".post-detail",
+    ".post-content",
+    ".entry-content",
+    ".article-content",
+    ".content",
+    "#content",
+    "#__next",
+    "body",
+]
+
+_SCORE_TAG_FIELD = {
+    "p": 0, "li": 1,
+    "h1": 2, "h2": 2, "h3": 2, "h4": 2,
+    "pre": 3, "code": 4, "blockquote": 5, "img": 6,
+    "nav": 7, "header": 7, "footer": 7, "aside": 7,
+}
+_I_TLEN, _I_NSTR, _N_FIELDS = 8, 9, 10
+
+
+def _score(node, st) -> int:
+    p, li, h, pre, code, bq, img, bad, tlen, nstr = st
+    tlen += max(nstr - 1, 0)
+
+    cls = " ".join(_classes(node)).lower()
+    nid = (node.get("id") or "").lower()
+    if any(k in cls for k in ["comment", "sidebar", "related", "recommend", "widget", "breadcrumb", "footer"]):
+        bad += 10
+    if any(k in nid for k in ["comment", "sidebar", "related", "recommend", "footer"]):
+        bad += 10
+
+    return (min(tlen, 20000) + p * 300 + li * 120 + h * 200 + pre * 200
+            + code * 50 + bq * 150 + img * 10 - bad * 500)
+
+
+def pick_content_root(root):
+    # 1) 前序走一次：收候選 + 記錄每個元素的文字是否算數
+    rules = [(sel[0], sel[1:]) if sel[0] in ".#" else ("", sel) for sel in CONTENT_ROOT_SELECTORS]
+    buckets = [[] for _ in rules]
+    order = []
+    excluded = {}
+
+    stack = [(root, any(a.tag in _NO_TEXT_TAGS for a in root.iterancestors()))]
+    while stack:
+        el, ex = stack.pop()
+        ex = ex or el.tag in _NO_TEXT_TAGS
+        order.append(el)
+        excluded[el] = ex
+
+        classes = _classes(el)
+        for i, (kind, val) in enumerate(rules):
+            if kind == ".":
+                if val in classes:
+                    buckets[i].append(el)
+            elif kind == "#":
+                if el.get("id") == val:
+                    buckets[i].append(el)
+            elif el.tag == val:
+                buckets[i].append(el)
+
+        stack.extend((c, ex) for c in reversed(el) if isinstance(c.tag, str))
+
+    candidates = [n for b in buckets for n in b]
+    if not candidates:
+        body = next(root.iter("body"), None)
+        return body if body is not None else root
+
+    # 2) 由下往上累加
+    stats = {}
+    for el in reversed(order):
+        agg = [0] * _N_FIELDS
+        ex = excluded[el]
+        if el.text and not ex:
+            t = el.text.strip()
+            if t:
+                agg[_I_TLEN] += len(t)
+                agg[_I_NSTR] += 1
+        for c in el:
+            if isinstance(c.tag, str):
+                cst = stats[c]
+                for i in range(_N_FIELDS):
+                    agg[i] += cst[i]
+                f = _SCORE_TAG_FIELD.get(c.tag)
+                if f is not None:
+                    agg[f] += 1
+            if c.tail and not ex:
+                t = c.tail.strip()
+                if t:
+                    agg[_I_TLEN] += len(t)
+                    agg[_I_NSTR] += 1
+        stats[el] = agg
+
+    return max(candidates, key=lambda n: _score(n, stats[n]))
+
+
+# =========================
+# 正文區塊：同 iter_content_blocks
+# =========================
+_BLOCK_TAGS = {"h1", "h2", "h3", "h4", "p", "li", "blockquote", "pre", "img"}
+_DROP_TAGS = {"script", "style", "noscript"}   # bs4 版會先 decompose 掉
+
+
+def is_probably_nav_or_junk(el) -> bool:
+    if el.tag in {"nav", "header", "footer", "aside", "script", "style", "noscript"}:
+        return True
+    cls = " ".join(_classes(el)).lower()
+    if any(k in cls for k in ["share", "related", "sidebar", "widget", "comment", "ads", "advert", "breadcrumb"]):
+        return True
+    return False
+
+
+def iter_content_blocks(root):
+    for el in _iter_elements(root, skip=_DROP_TAGS):
+        if el.tag not in _BLOCK_TAGS or is_probably_nav_or_junk(el):
+            continue
+
+        if el.tag in ("h1", "h2", "h3", "h4"):
+            txt = get_text(el, " ", _DROP_TAGS)
+            if txt:
+                yield ("heading", el.tag, txt)
+        elif el.tag == "p":
+            txt = get_text(el, " ", _DROP_TAGS)
+            if txt:
+                yield ("p", txt)
+        elif el.tag == "li":
+            txt = get_text(el, " ", _DROP_TAGS)
+            if txt:
+                yield ("li", txt)
+        elif el.tag == "blockquote":
+            txt = get_text(el, " ", _DROP_TAGS)
+            if txt:
+                yield ("quote", txt)
+        elif el.tag == "pre":
+            txt = get_text(el, "\n", _DROP_TAGS)
+            if txt:
+                yield ("codeblock", txt)
+        elif el.tag == "img":
+            src = el.get("src") or el.get("data-src") or el.get("data-lazy-src") or el.get("data-original")
+            if not src:
+                continue
+            alt = (el.get("alt") or "").strip()
+            yield ("img", src, alt)
+
+
+# =========================
+# 文章總表：同 extract_posts / find_next_page
+# =========================
+def extract_posts(root):
+    rows = []
+
+    articles = list(root.iter("article"))
+    if not articles:
+        articles = list(root.iter("h2"))
+
+    for a in articles:
+        if a.tag != "h2":
+            found = a.xpath(".//a[ancestor::h2]")
+        else:
+            found = a.xpath(".//a")
+        title_a = found[0] if found else None
+        if title_a is None or not title_a.get("href"):
+            continue
+
+        title = get_text(title_a)
+        link = title_a.get("href").strip()
+
+        dt = ""
+        time_el = None
+        if a.tag != "h2":
+            found = a.xpath(".//time[@datetime]")
+            time_el = found[0] if found else None
+        if time_el is not None and time_el.get("datetime"):
+            dt = time_el.get("datetime")[:10]
+        else:
+            time_any = None
+            if a.tag != "h2":
+                found = a.xpath(".//time")
+                time_any = found[0] if found else None
+            if time_any is not None:
+                dt = get_text(time_any)
+
+        rows.append({
+            "日期": dt,
+            "名稱": title,
+            "網址": link
+        })
+
+    uniq = {}
+    for r in rows:
+        uniq[r["網址"]] = r
+    return list(uniq.values())
+
+
+def find_next_page(root, current_url: str):
+    anchors = list(root.iter("a"))
+
+    a = next((x for x in anchors if " ".join((x.get("rel") or "").split()) == "next"), None)
+    if a is not None and a.get("href"):
+        return urljoin(current_url, a.get("href"))
+
+    for cand in anchors:
+        if "next" in get_text(cand).lower() and cand.get("href"):
+            return urljoin(current_url, cand.get("href"))
+    return None
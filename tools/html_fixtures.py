@@ -0,0 +1,109 @@
+# 檔名：html_fixtures.py
+# 一致性檢查用的小頁面（直接寫在程式裡，不用另外準備 HTML 檔）
+#   bench_pick_content_root.py / check_html_backend.py 加上 --fixtures 就只跑這些
+# 每頁刻意放一些容易讓兩個版本結果不同的東西：template、ruby、註解、CDATA、noscript、巢狀候選…
+#
+# 新增頁面：直接在 FIXTURES 加一筆（名稱 → HTML）
+FIXTURES = {}
+
+# 一般文章：article 裡面有標題、段落、清單、引言、程式碼、圖片；外面有 nav / aside 干擾
+FIXTURES["article_basic"] = """<!DOCTYPE html>
+<html><head>
+<meta charset="utf-8">
+<title>第一篇文章 @ 測試部落格 :: 痞客邦</title>
+<meta property="article:published_time" content="2024-05-01T10:00:00+08:00">
+</head><body>
+<nav><ul><li><a href="/">首頁</a></li><li><a href="/about">關於</a></li></ul></nav>
+<article class="post">
+  <h1>第一篇文章</h1>
+  <p>第一段，<b>粗體</b>跟<i>斜體</i>混在一起。</p>
+  <p>第二段<br>換行之後的字</p>
+  <ul><li>清單一</li><li>清單 <a href="/x">連結</a> 二</li></ul>
+  <blockquote>引言內容</blockquote>
+  <pre>line 1
+  line 2</pre>
+  <img src="/img/a.jpg" alt=" 圖 A ">
+  <img data-src="/img/b.webp">
+  <div class="share-buttons"><p>分享到 Facebook</p></div>
+</article>
+<aside class="sidebar"><h2>熱門文章</h2><p>側邊欄文字很多很多很多很多很多很多很多很多很多很多</p></aside>
+<footer><p>版權所有</p></footer>
+</body></html>"""
+
+# template / ruby / 註解 / CDATA：bs4 的 get_text 不算 template、rt、rp，也不算註解
+FIXTURES["template_ruby_comments"] = """<html><head><title>  標記測試  </title></head><body>
+<div id="main-content">
+  <h2>漢字<ruby>漢<rp>(</rp><rt>かん</rt><rp>)</rp></ruby>字標題</h2>
+  <template><p>樣板裡的字不算</p></template>
+  <p>前面<!-- 註解不算 -->後面</p>
+  <p><![CDATA[ 這段是 CDATA ]]>CDATA 之後</p>
+  <script>var s = "<p>script 裡的字</p>";</script>
+  <style>p { color: red; }</style>
+  <p>最後一段 <span>巢狀 <em>很深</em> 的字</span></p>
+</div>
+</body></html>"""
+
+# noscript：延遲載入的圖片常把真圖放在 noscript 裡；bs4 版會先 decompose 掉 script/style/noscript
+FIXTURES["noscript_lazy"] = """<html><head><title>noscript</title>
+<meta name="pubdate" content="2023/12/31"></head><body>
+<div class="entry-content">
+  <p>有 noscript 的段落<noscript>不要這段</noscript>結束</p>
+  <img class="lazy" data-lazy-src="/lazy.png" alt="lazy">
+  <noscript><img src="/real.png" alt="real"></noscript>
+  <p>第二段文字</p>
+</div>
+</body></html>"""
+
+# 巢狀候選：外層 div 跟內層 article-content 分數接近，看兩版選同一個
+FIXTURES["nested_candidates"] = """<html><head><title>巢狀</title></head><body>
+<div class="content">
+  <div class="widget"><p>小工具</p><p>小工具</p><p>小工具</p></div>
+  <div class="article-content">
+    <h3>小標</h3>
+    <p>正文一，長一點的句子讓分數高一點點。</p>
+    <p>正文二，長一點的句子讓分數高一點點。</p>
+    <p>正文三，長一點的句子讓分數高一點點。</p>
+    <img src="/c.jpg">
+  </div>
+  <div class="related"><h4>相關文章</h4><ul><li><a href="/r1">相關一</a></li></ul></div>
+</div>
+<div class="comments"><p>留言一</p><p>留言二</p></div>
+</body></html>"""
+
+# 沒關好的標籤、表格裡的段落、內文日期
+FIXTURES["malformed"] = """<html><head><title>壞掉的 HTML</title></head><body>
+<div class="post-body">
+<p>沒關的段落一
+<p>沒關的段落二 發表於 2022-03-04
+<table><tr><td><p>表格裡的段落</td></tr></table>
+<li>孤兒 li
+<h4>標題 <b>沒關
+</div>
+<p>div 外面的段落</p>
+</body></html>"""
+
+# 文章列表：article + h2 a + time；下一頁的 rel 有好幾個值（rel="next nofollow"），
+# 後面還有一個文字含 next 的連結指到別的地方 → rel 的比對方式不同就會選到不同網址
+FIXTURES["listing_rel_multi"] = """<html><head><title>文章列表</title></head><body>
+<main>
+<article><h2><a href="/blog/post-1">第一篇 <small>置頂</small></a></h2>
+  <time datetime="2024-05-01T10:00:00+08:00">2024/05/01</time></article>
+<article><h2><a href=" /blog/post-2 ">第二篇</a></h2><time>2024-04-20</time></article>
+<article><h3><a href="/blog/not-h2">不在 h2 的不算</a></h3></article>
+<article><h2><a href="/blog/post-1">重複的網址留最後一筆</a></h2></article>
+</main>
+<div class="pager">
+  <a rel="prev" href="/blog/">上一頁</a>
+  <a rel="next nofollow" href="/blog/page/2">下一頁 »</a>
+</div>
+<p><a href="/blog/next-steps">Next steps 教學</a></p>
+</body></html>"""
+
+# 沒有 article：退回用 h2；下一頁只有 rel="next"
+FIXTURES["listing_h2_only"] = """<html><head><title>只有 h2</title></head><body>
+<h2><a href="https://example.com/a">A 篇</a></h2>
+<h2><a href="b">B 篇</a></h2>
+<h2>沒有連結</h2>
+<a href="/blog/page/3">older</a>
+<a rel="next" href="?page=2">下一頁</a>
+</body></html>"""
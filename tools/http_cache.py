@@ -0,0 +1,167 @@
+# 檔名：http_cache.py
+# 網頁 HTTP 快取（掛在 requests.Session 底下的 adapter）：
+#   - 200 的 HTML 連同 ETag / Last-Modified 存到硬碟
+#   - 下次再抓同網址 → 帶 If-None-Match / If-Modified-Since，伺服器回 304 就直接用舊內容
+#   - 遵守 Cache-Control（no-store 不存、no-cache 一定重新驗證、max-age 內直接用）
+#   - offline=True：完全不連網，只回放快取（重現抽取問題用）
+#
+# 用法：
+#   adapter = CachingAdapter(cache_dir, offline=False, pool_maxsize=32)
+#   session.mount("http://", adapter)
+#   session.mount("https://", adapter)
+import os
+import json
+import time
+import hashlib
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+# 只快取這些 Content-Type（圖片另外有 img_cache，不用在這裡重複存）
+CACHE_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/xml", "application/xml")
+
+# 304 回來時要更新的 header
+REVALIDATE_HEADERS = ("Cache-Control", "ETag", "Last-Modified", "Expires", "Date")
+
+
+class OfflineCacheMiss(requests.exceptions.ConnectionError):
+    """offline 模式下快取裡沒有這個網址（重試也沒用）"""
+
+
+def parse_cache_control(value: str) -> dict:
+    out = {}
+    for part in (value or "").split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        k, _, v = part.partition("=")
+        out[k.strip()] = v.strip().strip('"')
+    return out
+
+
+class CachingAdapter(HTTPAdapter):
+    def __init__(self, cache_dir: str, offline: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.cache_dir = cache_dir
+        self.offline = offline
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # ---------- 硬碟存取 ----------
+    def _paths(self, url: str):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        sub = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(sub, key + ".json"), os.path.join(sub, key + ".body")
+
+    def _load(self, url: str):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+            meta["headers"] = CaseInsensitiveDict(meta.get("headers") or {})
+            return meta, body
+        except (OSError, ValueError):
+            return None, None
+
+    def _save(self, url: str, meta: dict, body: bytes = None):
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        if body is not None:
+            with open(body_path + suffix, "wb") as f:
+                f.write(body)
+            os.replace(body_path + suffix, body_path)
+        with open(meta_path + suffix, "w", encoding="utf-8") as f:
+            json.dump(dict(meta, headers=dict(meta["headers"])), f, ensure_ascii=False)
+        os.replace(meta_path + suffix, meta_path)
+
+    # ---------- 快取規則 ----------
+    @staticmethod
+    def _is_fresh(meta: dict) -> bool:
+        cc = parse_cache_control(meta["headers"].get("Cache-Control", ""))
+        if "no-cache" in cc:
+            return False
+        max_age = cc.get("max-age", "")
+        if not max_age.isdigit():
+            return False
+        return time.time() - meta["stored_at"] < int(max_age)
+
+    @staticmethod
+    def _is_storable(resp) -> bool:
+        if resp.status_code != 200:
+            return False
+        cc = parse_cache_control(resp.headers.get("Cache-Control", ""))
+        if "no-store" in cc:
+            return False
+        ctype = (resp.headers.get("Content-Type") or "").lower()
+        return any(t in ctype for t in CACHE_CONTENT_TYPES)
+
+    def _replay(self, request, meta: dict, body: bytes):
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.reason = "OK"
+        resp.headers = CaseInsensitiveDict(meta["headers"])
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp._content = body
+        resp._content_consumed = True
+        resp.url = request.url
+        resp.request = request
+        resp.connection = self
+        resp.from_cache = True
+        return resp
+
+    def serves_from_cache(self, url: str) -> bool:
+        """這個網址會不會直接從快取回（offline 模式，或快取還在 max-age 內）→ 不用連網，呼叫端可以不限速"""
+        if self.offline:
+            return True
+        meta, _ = self._load(url)
+        return meta is not None and self._is_fresh(meta)
+
+    # ---------- adapter 入口 ----------
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if request.method != "GET" or "Range" in request.headers:
+            return super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+
+        url = request.url
+        meta, body = self._load(url)
+
+        if self.offline:
+            if meta is None:
+                raise OfflineCacheMiss(f"offline 模式且沒有快取：{url}", request=request)
+            return self._replay(request, meta, body)
+
+        if meta is not None:
+            if self._is_fresh(meta):
+                return self._replay(request, meta, body)
+            etag = meta["headers"].get("ETag")
+            last_mod = meta["headers"].get("Last-Modified")
+            if etag:
+                request.headers["If-None-Match"] = etag
+            if last_mod:
+                request.headers["If-Modified-Since"] = last_mod
+
+        resp = super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+
+        if resp.status_code == 304 and meta is not None:
+            resp.close()
+            # 304 可能帶新的 Cache-Control / ETag，合併回去
+            for k in REVALIDATE_HEADERS:
+                if k in resp.headers:
+                    meta["headers"][k] = resp.headers[k]
+            meta["stored_at"] = time.time()
+            self._save(url, meta)
+            return self._replay(request, meta, body)
+
+        if not stream and self._is_storable(resp):
+            self._save(url, {
+                "url": url,
+                "stored_at": time.time(),
+                "headers": resp.headers,
+            }, resp.content)
+
+        return resp
@@ -0,0 +1,205 @@
+# 檔名：http_client.py
+# 各爬蟲腳本共用的 HTTP 工具：
+#   - make_session()：連線池開夠大，可選擇掛上 http_cache 的硬碟快取
+#   - get()：取代 session.get
+#       * 429 / 5xx / 逾時 / 連線中斷 → 指數退避 + jitter 重試，有 Retry-After 就照它等
+#       * 每個 host 一個併發上限（semaphore）
+#       * 每個 host 一個自動調速的限速器：出錯就減半，連續成功就慢慢加速
+#       * 快取直接回得了的（max-age 內、offline 回放）不連網，也就不排限速
+#
+# 用法：
+#   import http_client
+#   http_client.configure(per_host_limit=4, rate=2.0)
+#   s = http_client.make_session(headers={...}, pool_maxsize=32)
+#   r = http_client.get(s, url, timeout=30)
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import CachingAdapter, OfflineCacheMiss
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# ===== 預設值（用 configure() 改） =====
+SETTINGS = {
+    "per_host_limit": 4,     # 同一個 host 最多同時幾個連線
+    "rate": 2.0,             # 每個 host 一開始每秒幾個請求
+    "min_rate": 0.2,         # 一直出錯最慢降到這裡
+    "max_rate": 10.0,        # 一直順利最快升到這裡
+    "rate_step": 0.2,        # 每次成功加多少（慢慢加）
+    "burst": 4,              # 一開始可以連發幾個
+    "retries": 4,            # 失敗最多重試幾次
+    "backoff": 1.0,          # 第一次重試等幾秒（之後每次 x2）
+    "backoff_max": 60.0,     # 單次最多等幾秒
+}
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+def configure(**kwargs):
+    unknown = set(kwargs) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f"不認得的設定：{', '.join(sorted(unknown))}")
+    SETTINGS.update(kwargs)
+    # 已建立的 host 狀態作廢，下次用到時照新設定重建
+    with _HOSTS_LOCK:
+        _HOSTS.clear()
+
+
+# =========================
+# 每個 host：自動調速的 token bucket
+# =========================
+class AdaptiveLimiter:
+    def __init__(self, rate: float, min_rate: float, max_rate: float, step: float, burst: int):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.step = step
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.step)
+
+    def on_error(self):
+        # 出錯：速度減半，手上的 token 也清掉，下一個請求一定要等
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+
+class _HostState:
+    def __init__(self):
+        self.slot = threading.BoundedSemaphore(SETTINGS["per_host_limit"])
+        self.limiter = AdaptiveLimiter(
+            SETTINGS["rate"], SETTINGS["min_rate"], SETTINGS["max_rate"],
+            SETTINGS["rate_step"], SETTINGS["burst"],
+        )
+
+
+_HOSTS = {}
+_HOSTS_LOCK = threading.Lock()
+
+
+def host_state(url: str) -> _HostState:
+    host = urlparse(url).netloc.lower()
+    with _HOSTS_LOCK:
+        st = _HOSTS.get(host)
+        if st is None:
+            st = _HostState()
+            _HOSTS[host] = st
+    return st
+
+
+# =========================
+# Session
+# =========================
+def make_session(headers: dict = None, pool_maxsize: int = 10, cache_dir: str = None,
+                 offline: bool = False) -> requests.Session:
+    s = requests.Session()
+    s.headers.update(headers or DEFAULT_HEADERS)
+    if cache_dir:
+        adapter = CachingAdapter(cache_dir, offline=offline, pool_connections=20, pool_maxsize=pool_maxsize)
+    else:
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=pool_maxsize)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+_DEFAULT_SESSION = None
+_DEFAULT_SESSION_LOCK = threading.Lock()
+
+
+def default_session() -> requests.Session:
+    """給沒有自己 session 的小腳本用（例如 抓日期.py），整個程式共用一個連線池"""
+    global _DEFAULT_SESSION
+    with _DEFAULT_SESSION_LOCK:
+        if _DEFAULT_SESSION is None:
+            _DEFAULT_SESSION = make_session(pool_maxsize=32)
+        return _DEFAULT_SESSION
+
+
+# =========================
+# GET：限速 + 重試
+# =========================
+def _retry_after_seconds(resp):
+    val = (resp.headers.get("Retry-After") or "").strip()
+    if not val:
+        return None
+    if val.isdigit():
+        return float(val)
+    try:
+        return max(0.0, parsedate_to_datetime(val).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def _backoff_seconds(attempt: int) -> float:
+    # 指數退避 + jitter（equal jitter：一半固定、一半隨機，避免大家同時重試）
+    d = min(SETTINGS["backoff_max"], SETTINGS["backoff"] * (2 ** attempt))
+    return d / 2 + random.uniform(0, d / 2)
+
+
+def get(session: requests.Session, url: str, timeout=30, **kwargs) -> requests.Response:
+    """同 session.get，但會限速、重試；最後一次還是 429/5xx 就把那個 response 回傳（呼叫端自己 raise_for_status）"""
+    st = host_state(url)
+    retries = SETTINGS["retries"]
+
+    # 快取直接回（max-age 內 / offline 回放）不會連網 → 不排限速、不佔連線
+    adapter = session.get_adapter(url)
+    if isinstance(adapter, CachingAdapter) and "Range" not in (kwargs.get("headers") or {}):
+        full_url = url
+        if kwargs.get("params"):
+            full_url = requests.Request("GET", url, params=kwargs["params"]).prepare().url
+        if adapter.serves_from_cache(full_url):
+            return session.get(url, timeout=timeout, **kwargs)
+
+    for attempt in range(retries + 1):
+        st.limiter.acquire()
+        try:
+            with st.slot:
+                r = session.get(url, timeout=timeout, **kwargs)
+        except OfflineCacheMiss:
+            raise
+        except (requests.Timeout, requests.ConnectionError):
+            st.limiter.on_error()
+            if attempt >= retries:
+                raise
+            time.sleep(_backoff_seconds(attempt))
+            continue
+
+        if r.status_code in RETRY_STATUS:
+            st.limiter.on_error()
+            if attempt >= retries:
+                return r
+            wait = _backoff_seconds(attempt)
+            ra = _retry_after_seconds(r)
+            if ra is not None:
+                wait = max(wait, min(ra, SETTINGS["backoff_max"]))
+            r.close()
+            time.sleep(wait)
+            continue
+
+        st.limiter.on_success()
+        return r
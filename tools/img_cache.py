@@ -0,0 +1,156 @@
+# 檔名：img_cache.py
+# 圖片快取（跨執行共用）：
+#   - 以 URL 查詢，內容用 sha256 存檔（同一張圖不同網址只存一份）
+#   - webp 轉好的 png 也一起存，重跑不用再轉一次
+#   - 超過容量上限就照「最久沒用」刪（LRU）
+#   - get_or_load()：同一個網址正在被別的執行緒下載時，等它下載完共用結果，不會重抓
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from concurrent.futures import Future
+
+
+class ImageCache:
+    def __init__(self, root: str, max_bytes: int = 2 * 1024 ** 3):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.max_bytes = max_bytes
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self._pending = {}   # url → Future（下載中）
+        self._pending_lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url     TEXT PRIMARY KEY,
+                sha     TEXT NOT NULL,
+                ctype   TEXT NOT NULL,
+                png_sha TEXT
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha   TEXT PRIMARY KEY,
+                size  INTEGER NOT NULL,
+                atime REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS blobs_atime ON blobs(atime);
+        """)
+        self.db.commit()
+
+    # ---------- blob 檔案 ----------
+    def _blob_path(self, sha: str) -> str:
+        return os.path.join(self.blob_dir, sha[:2], sha)
+
+    def _read_blob(self, sha: str):
+        try:
+            with open(self._blob_path(sha), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_blob(self, data: bytes) -> str:
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        self.db.execute(
+            "INSERT INTO blobs(sha, size, atime) VALUES(?, ?, ?) "
+            "ON CONFLICT(sha) DO UPDATE SET atime = excluded.atime",
+            (sha, len(data), time.time()),
+        )
+        return sha
+
+    # ---------- 對外 ----------
+    def get(self, url: str):
+        """回傳 (bytes, ctype)；有轉好的 png 就直接給 png。沒快取回 None"""
+        with self.lock:
+            row = self.db.execute("SELECT sha, ctype, png_sha FROM urls WHERE url = ?", (url,)).fetchone()
+            if not row:
+                return None
+            sha, ctype, png_sha = row
+
+            if png_sha:
+                data = self._read_blob(png_sha)
+                if data is not None:
+                    self.db.execute("UPDATE blobs SET atime = ? WHERE sha = ?", (time.time(), png_sha))
+                    self.db.commit()
+                    return data, "image/png"
+
+            data = self._read_blob(sha)
+            if data is None:
+                # 檔案被手動刪掉了 → 當作沒快取
+                self.db.execute("DELETE FROM urls WHERE url = ?", (url,))
+                self.db.commit()
+                return None
+            self.db.execute("UPDATE blobs SET atime = ? WHERE sha = ?", (time.time(), sha))
+            self.db.commit()
+            return data, ctype
+
+    def get_or_load(self, url: str, loader):
+        """有快取直接回傳；沒有就呼叫 loader()（自己負責下載 + put），回傳它的結果。
+        同一個網址同時有好幾個執行緒要，只有第一個真的下載，其他等它的結果"""
+        hit = self.get(url)
+        if hit:
+            return hit
+
+        with self._pending_lock:
+            fut = self._pending.get(url)
+            owner = fut is None
+            if owner:
+                fut = Future()
+                self._pending[url] = fut
+        if not owner:
+            return fut.result()
+
+        try:
+            # 剛才查快取之後、登記之前，別人可能剛好下載完
+            result = self.get(url) or loader()
+            fut.set_result(result)
+            return result
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._pending_lock:
+                self._pending.pop(url, None)
+
+    def put(self, url: str, data: bytes, ctype: str, converted_png: bytes = None):
+        with self.lock:
+            sha = self._write_blob(data)
+            png_sha = self._write_blob(converted_png) if converted_png else None
+            self.db.execute(
+                "INSERT OR REPLACE INTO urls(url, sha, ctype, png_sha) VALUES(?, ?, ?, ?)",
+                (url, sha, ctype or "", png_sha),
+            )
+            self.db.commit()
+            self._evict_locked()
+
+    def _evict_locked(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # 刪到上限的 90%，避免每次 put 都在刪
+        target = int(self.max_bytes * 0.9)
+        for sha, size in self.db.execute("SELECT sha, size FROM blobs ORDER BY atime").fetchall():
+            if total <= target:
+                break
+            try:
+                os.remove(self._blob_path(sha))
+            except OSError:
+                pass
+            self.db.execute("DELETE FROM blobs WHERE sha = ?", (sha,))
+            self.db.execute("DELETE FROM urls WHERE sha = ?", (sha,))
+            self.db.execute("UPDATE urls SET png_sha = NULL WHERE png_sha = ?", (sha,))
+            total -= size
+        self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,176 @@
+# 檔名：inventory_sink.py
+# 文章總表的讀寫（不用 pandas）：
+#   - open_sink(path)：邊爬邊寫，同一個網址只寫第一次；每 FLUSH_EVERY 筆寫進硬碟一次
+#       .csv   → UTF-8 BOM（Excel 直接開不會亂碼）
+#       .jsonl → 一行一筆
+#       .xlsx  → openpyxl write-only；另外同步寫一份 .part.jsonl，當掉時資料還在
+#     寫到一半先放在 <檔名>.part，close() 時才換成正式檔名（中途當掉不會蓋壞舊檔）
+#   - read_rows(path)：讀 .csv / .jsonl / .json / .xlsx → [{日期, 名稱, 網址}]
+import os
+import csv
+import json
+
+COLUMNS = ["日期", "名稱", "網址"]
+FLUSH_EVERY = 50   # 每幾筆寫進硬碟一次
+
+
+class _Sink:
+    def __init__(self, path: str, part: str = None):
+        self.path = path
+        self.part = part or path + ".part"
+        self.seen = set()
+        self.count = 0
+        self._pending = 0
+
+    def write(self, row: dict) -> bool:
+        """寫一筆；網址重複就不寫，回傳 False"""
+        url = row.get("網址")
+        if not url or url in self.seen:
+            return False
+        self.seen.add(url)
+        self._write([str(row.get(c) or "") for c in COLUMNS])
+        self.count += 1
+        self._pending += 1
+        if self._pending >= FLUSH_EVERY:
+            self.flush()
+        return True
+
+    def write_many(self, rows) -> int:
+        return sum(1 for r in rows if self.write(r))
+
+    def flush(self):
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        os.replace(self.part, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # 出錯就不換檔名：舊檔不動，寫到一半的留在 .part
+            self._abort()
+            print(f"[WARN] 總表沒寫完，已寫的 {self.count} 筆留在：{self.part}")
+
+    def _abort(self):
+        pass
+
+
+class _TextSink(_Sink):
+    def __init__(self, path: str, encoding: str = "utf-8", part: str = None):
+        super().__init__(path, part)
+        self.f = open(self.part, "w", encoding=encoding, newline="")
+
+    def flush(self):
+        super().flush()
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def close(self):
+        self.flush()
+        self.f.close()
+        os.replace(self.part, self.path)
+
+    def _abort(self):
+        self.f.flush()
+        self.f.close()
+
+
+class CsvSink(_TextSink):
+    def __init__(self, path: str):
+        super().__init__(path, encoding="utf-8-sig")
+        self.w = csv.writer(self.f)
+        self.w.writerow(COLUMNS)
+
+    def _write(self, values):
+        self.w.writerow(values)
+
+
+class JsonlSink(_TextSink):
+    def __init__(self, path: str, part: str = None):
+        super().__init__(path, part=part)
+
+    def _write(self, values):
+        self.f.write(json.dumps(dict(zip(COLUMNS, values)), ensure_ascii=False) + "\n")
+
+
+class XlsxSink(_Sink):
+    """write-only 模式一列一列寫，不會整張表留在記憶體；xlsx 要存檔才看得到，所以另外寫 .part.jsonl 保底"""
+
+    def __init__(self, path: str):
+        from openpyxl import Workbook
+        super().__init__(path, part=path + ".part.xlsx")   # openpyxl 看副檔名
+        self.wb = Workbook(write_only=True)
+        self.ws = self.wb.create_sheet()
+        self.ws.append(COLUMNS)
+        self.journal = JsonlSink(path, part=path + ".part.jsonl")
+
+    def _write(self, values):
+        self.ws.append(values)
+        self.journal._write(values)
+
+    def flush(self):
+        super().flush()
+        self.journal.flush()
+
+    def close(self):
+        self.wb.save(self.part)
+        os.replace(self.part, self.path)
+        self.journal.f.close()
+        os.remove(self.journal.part)
+
+    def _abort(self):
+        # 讓 openpyxl 的串流寫入正常收尾（不然回收時會噴錯）；不完整的 xlsx 不留，資料看 .part.jsonl
+        try:
+            self.wb.save(self.part)
+            os.remove(self.part)
+        except OSError:
+            pass
+        self.journal._abort()
+        self.part = self.journal.part
+
+
+def open_sink(path: str) -> _Sink:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return CsvSink(path)
+    if ext == ".jsonl":
+        return JsonlSink(path)
+    if ext == ".xlsx":
+        return XlsxSink(path)
+    raise ValueError(f"不支援的總表格式：{path}（.csv / .jsonl / .xlsx）")
+
+
+# =========================
+# 讀
+# =========================
+def read_rows(path: str):
+    """讀總表 → [{日期, 名稱, 網址}]（欄位都是字串）；檔案不存在回空 list"""
+    if not path or not os.path.isfile(path):
+        return []
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    elif ext == ".jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            data = [json.loads(line) for line in f if line.strip()]
+    elif ext == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            data = list(csv.DictReader(f))
+    elif ext == ".xlsx":
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True)
+        it = wb.active.iter_rows(values_only=True)
+        header = [str(h) if h is not None else "" for h in next(it, ())]
+        data = [dict(zip(header, r)) for r in it]
+        wb.close()
+    else:
+        raise ValueError(f"不支援的總表格式：{path}")
+
+    return [{c: "" if r.get(c) is None else str(r.get(c)) for c in COLUMNS} for r in data if r.get("網址")]
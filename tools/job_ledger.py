@@ -0,0 +1,98 @@
+# 檔名：job_ledger.py
+# 批次工作紀錄（SQLite）：每個網址一筆，記錄狀態、輸出檔、內容 hash、耗時、錯誤訊息。
+# 中途當掉 / Ctrl+C 之後重跑，就能只處理還沒完成的。
+#
+# 狀態：
+#   running  開始處理但還沒結束（當掉的話會停在這個狀態）
+#   done     成功輸出
+#   skipped  輸出檔已存在，沒有重做
+#   failed   失敗（error 欄位有原因）
+#
+# 另外每個網站記一筆「用哪種方式抓得到內容」（hosts 表），混合抓取用來決定要不要直接開瀏覽器。
+import time
+import sqlite3
+import threading
+
+DONE_STATUSES = ("done", "skipped")
+
+
+class JobLedger:
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                url          TEXT PRIMARY KEY,
+                status       TEXT NOT NULL,
+                out_path     TEXT,
+                content_hash TEXT,
+                attempts     INTEGER NOT NULL DEFAULT 0,
+                started_at   REAL,
+                finished_at  REAL,
+                elapsed_sec  REAL,
+                error        TEXT
+            )
+        """)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS hosts (
+                host           TEXT PRIMARY KEY,
+                http_ok        INTEGER NOT NULL DEFAULT 0,
+                browser_needed INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.db.commit()
+
+    def get(self, url: str):
+        with self.lock:
+            row = self.db.execute("SELECT * FROM jobs WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def start(self, url: str):
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO jobs(url, status, attempts, started_at) VALUES(?, 'running', 1, ?) "
+                "ON CONFLICT(url) DO UPDATE SET status = 'running', attempts = attempts + 1, "
+                "started_at = excluded.started_at, finished_at = NULL, elapsed_sec = NULL, error = NULL",
+                (url, time.time()),
+            )
+            self.db.commit()
+
+    def finish(self, url: str, status: str, out_path: str = None, content_hash: str = None, error: str = None):
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "UPDATE jobs SET status = ?, out_path = COALESCE(?, out_path), "
+                "content_hash = COALESCE(?, content_hash), finished_at = ?, "
+                "elapsed_sec = ? - started_at, error = ? WHERE url = ?",
+                (status, out_path, content_hash, now, now, error, url),
+            )
+            self.db.commit()
+
+    def counts(self) -> dict:
+        with self.lock:
+            rows = self.db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    def host_vote(self, host: str, needs_browser: bool):
+        """記一次這個網站的結果：requests 就抓得到內容，或要瀏覽器才抓得到"""
+        col = "browser_needed" if needs_browser else "http_ok"
+        with self.lock:
+            self.db.execute(
+                f"INSERT INTO hosts(host, {col}) VALUES(?, 1) "
+                f"ON CONFLICT(host) DO UPDATE SET {col} = {col} + 1",
+                (host,),
+            )
+            self.db.commit()
+
+    def host_stats(self, host: str):
+        """回傳 (http_ok, browser_needed)"""
+        with self.lock:
+            row = self.db.execute("SELECT http_ok, browser_needed FROM hosts WHERE host = ?", (host,)).fetchone()
+        return (row[0], row[1]) if row else (0, 0)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
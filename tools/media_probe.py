@@ -0,0 +1,189 @@
+# 檔名：media_probe.py
+# 影音檔資訊（ffprobe）共用快取：剪片、Whisper 前處理都從這裡拿，同一個檔案只跑一次 ffprobe。
+#   - probe(path)：片長、格式、每個 stream 的編碼 / 解析度 / 取樣率…（ffprobe -of json 一次拿完）
+#   - duration(path)：probe(path)["duration"]
+#   - keyframes(path)：影像關鍵影格時間（從檔案開頭算，已扣掉 start_time）（要掃過整個檔案的封包，比較久，所以用到才掃）；掃過之後 keyframe_count 也會有值
+# 快取存在 SQLite（PROBE_DB_PATH），key = 完整路徑，另外記檔案大小 + 修改時間：檔案改過就自動重跑。
+#
+# 用法：
+#   import media_probe
+#   info = media_probe.probe("a.mp4")      # {"duration": 123.4, "streams": [...], "keyframe_count": None, ...}
+#   kfs = media_probe.keyframes("a.mp4")   # [0.0, 2.0, 4.0, ...]
+import os
+import json
+import sqlite3
+import subprocess
+import threading
+from pathlib import Path
+
+CACHE_DIR = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/.cache"), "blog_tools")   # 快取放使用者目錄，不放在程式旁邊
+PROBE_DB_PATH = os.path.join(CACHE_DIR, "media_probe.sqlite")   # 快取檔（None = 不存硬碟，只在這次執行裡記）
+
+# 每個 stream 留下來的欄位（ffprobe 原始輸出很長，用不到的不存）
+STREAM_FIELDS = (
+    "index", "codec_type", "codec_name", "profile", "level", "width", "height", "pix_fmt",
+    "r_frame_rate", "time_base", "sample_rate", "channels", "bit_rate", "duration",
+)
+INFO_VERSION = 3   # 存的欄位有改就加 1，舊的快取會自動重跑 ffprobe
+
+STATS = {"hit": 0, "probe": 0, "keyframe_scan": 0}   # 快取命中 / 實際跑 ffprobe 的次數（看效果用）
+
+
+class _Store:
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.mem = {}
+        self.db = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self.db = sqlite3.connect(path, check_same_thread=False)
+                self.db.execute("PRAGMA journal_mode=WAL")
+                self.db.execute("""
+                    CREATE TABLE IF NOT EXISTS media (
+                        path      TEXT PRIMARY KEY,
+                        size      INTEGER NOT NULL,
+                        mtime     REAL NOT NULL,
+                        info      TEXT,
+                        keyframes TEXT
+                    )
+                """)
+                self.db.commit()
+            except (OSError, sqlite3.Error) as e:
+                print(f"[WARN] 開不了 ffprobe 快取（{path}）：{e}，這次只記在記憶體")
+                self.db = None
+
+    def get(self, key: str, size: int, mtime: float):
+        """回傳 (info, keyframes)；沒有或檔案改過回 (None, None)"""
+        with self.lock:
+            row = self.mem.get(key)
+            if row is None and self.db is not None:
+                row = self.db.execute("SELECT size, mtime, info, keyframes FROM media WHERE path = ?",
+                                      (key,)).fetchone()
+                if row is not None:
+                    self.mem[key] = row
+        if row is None or row[0] != size or row[1] != mtime:
+            return None, None
+        info = json.loads(row[2]) if row[2] else None
+        kfs = json.loads(row[3]) if row[3] else None
+        return info, kfs
+
+    def put(self, key: str, size: int, mtime: float, info=None, keyframes=None):
+        """info / keyframes 給 None = 保留原本的（同一個檔案版本才保留）"""
+        with self.lock:
+            old = self.mem.get(key)
+            if old is not None and old[0] == size and old[1] == mtime:
+                info_s = json.dumps(info, ensure_ascii=False) if info is not None else old[2]
+                kf_s = json.dumps(keyframes) if keyframes is not None else old[3]
+            else:
+                info_s = json.dumps(info, ensure_ascii=False) if info is not None else None
+                kf_s = json.dumps(keyframes) if keyframes is not None else None
+            row = (size, mtime, info_s, kf_s)
+            self.mem[key] = row
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO media(path, size, mtime, info, keyframes) VALUES(?, ?, ?, ?, ?)",
+                    (key, *row),
+                )
+                self.db.commit()
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def _store() -> _Store:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = _Store(PROBE_DB_PATH)
+        return _STORE
+
+
+def _key(path):
+    p = Path(path).resolve()
+    st = p.stat()
+    return str(p), st.st_size, st.st_mtime
+
+
+# =========================
+# ffprobe
+# =========================
+def _run_probe(path: str) -> dict:
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_format", "-show_streams",
+        "-of", "json",
+        path
+    ]
+    raw = json.loads(subprocess.check_output(cmd).decode("utf-8", errors="replace"))
+    fmt = raw.get("format", {})
+    return {
+        "version": INFO_VERSION,
+        "duration": float(fmt.get("duration") or 0.0),
+        "start_time": float(fmt.get("start_time") or 0.0),   # 第一個時間戳（TS 轉來的 mp4、有 edit list 的常常不是 0）
+        "size": int(fmt.get("size") or 0),
+        "format_name": fmt.get("format_name", ""),
+        "bit_rate": fmt.get("bit_rate"),
+        "streams": [{k: s[k] for k in STREAM_FIELDS if k in s} for s in raw.get("streams", [])],
+    }
+
+
+def _scan_keyframes(path: str):
+    # 只讀封包標頭（不解碼），但還是要掃過整個檔案
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=p=0",
+        path
+    ]
+    out = subprocess.check_output(cmd).decode("utf-8", errors="replace")
+    kfs = []
+    for line in out.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) >= 2 and "K" in parts[1] and parts[0] not in ("", "N/A"):
+            kfs.append(float(parts[0]))
+    return sorted(set(kfs))
+
+
+def probe(path) -> dict:
+    """ffprobe 結果（有快取）：{duration, start_time, size, format_name, bit_rate, streams, keyframe_count}"""
+    key, size, mtime = _key(path)
+    store = _store()
+    info, kfs = store.get(key, size, mtime)
+    if info is None or info.get("version") != INFO_VERSION:
+        STATS["probe"] += 1
+        info = _run_probe(key)
+        store.put(key, size, mtime, info=info)
+    else:
+        STATS["hit"] += 1
+    info = dict(info)
+    info["keyframe_count"] = len(kfs) if kfs is not None else None
+    return info
+
+
+def duration(path) -> float:
+    return probe(path)["duration"]
+
+
+def keyframes(path):
+    """第一個影像 stream 的關鍵影格時間（秒，由小到大，有快取）
+    從檔案開頭算（已扣掉 start_time），跟 -ss、剪輯區段、字幕時間同一個基準；快取裡存的是原始 pts"""
+    start = probe(path)["start_time"]
+    key, size, mtime = _key(path)
+    store = _store()
+    _, kfs = store.get(key, size, mtime)
+    if kfs is None:
+        STATS["keyframe_scan"] += 1
+        kfs = _scan_keyframes(key)
+        store.put(key, size, mtime, keyframes=kfs)
+    return [round(k - start, 6) for k in kfs]
+
+
+def video_stream(info: dict):
+    return next((s for s in info.get("streams", []) if s.get("codec_type") == "video"), None)
+
+
+def audio_stream(info: dict):
+    return next((s for s in info.get("streams", []) if s.get("codec_type") == "audio"), None)
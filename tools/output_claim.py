@@ -0,0 +1,55 @@
+# 檔名：output_claim.py
+# 批次轉 docx 共用：同一次執行內，同一個輸出檔只做一次，而且同名時照 CSV 順序（前面那筆拿到檔名）
+#   - 檔名要抓完網頁才知道（頁面 title），併發時誰先抓完不一定；
+#     為了跟一筆一筆跑的結果一樣，第 idx 筆要等前面每一筆都「定案」才能登記
+#   - 定案 = 登記了檔名 / 不用登記（B 欄有名稱、已完成跳過、失敗、排到瀏覽器那輪）：每一筆不管怎麼結束都要 settle_output
+#   - claim_output 會卡住等前面的 → 執行緒版直接呼叫；asyncio 版用 asyncio.to_thread 呼叫（不要卡住 event loop）
+#
+# 用法：
+#   import output_claim
+#   output_claim.begin_claim_round([1, 2, 3, ...])        # 這輪的序號（照 CSV 順序）
+#   if output_claim.claim_output(out_path, idx): ...     # True = 拿到檔名；False = 前面的同名已經拿走了
+#   output_claim.settle_output(idx)                      # finally 裡呼叫（可以重複呼叫）
+import os
+import threading
+
+_CLAIMED_OUTPUTS = set()
+_CLAIM_COND = threading.Condition()
+_CLAIM_ROUND = {"order": [], "pos": {}, "settled": set(), "next": 0}
+
+
+def begin_claim_round(order):
+    """開始一輪（requests 那輪 / 瀏覽器那輪）：order = 這輪的序號，照 CSV 順序"""
+    with _CLAIM_COND:
+        _CLAIM_ROUND["order"] = list(order)
+        _CLAIM_ROUND["pos"] = {idx: i for i, idx in enumerate(order)}
+        _CLAIM_ROUND["settled"] = set()
+        _CLAIM_ROUND["next"] = 0
+        _CLAIM_COND.notify_all()
+
+
+def settle_output(idx: int):
+    """第 idx 筆已經定案（可以重複呼叫）；後面等著登記檔名的可以往下走"""
+    with _CLAIM_COND:
+        rnd = _CLAIM_ROUND
+        if idx not in rnd["pos"] or idx in rnd["settled"]:
+            return
+        rnd["settled"].add(idx)
+        order = rnd["order"]
+        while rnd["next"] < len(order) and order[rnd["next"]] in rnd["settled"]:
+            rnd["next"] += 1
+        _CLAIM_COND.notify_all()
+
+
+def claim_output(out_path: str, idx: int = None) -> bool:
+    """併發時「檔案已存在」判斷會來不及：照 CSV 順序登記，前面的網址先拿到檔名，後面同名的當作已存在。
+    idx 不在這輪裡（或沒給）就不等"""
+    key = os.path.normcase(os.path.abspath(out_path))
+    with _CLAIM_COND:
+        pos = _CLAIM_ROUND["pos"].get(idx)
+        if pos is not None:
+            _CLAIM_COND.wait_for(lambda: _CLAIM_ROUND["next"] >= pos)
+        ok = key not in _CLAIMED_OUTPUTS
+        _CLAIMED_OUTPUTS.add(key)
+    settle_output(idx)
+    return ok
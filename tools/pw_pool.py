@@ -0,0 +1,172 @@
+# 檔名：pw_pool.py
+# Playwright（async）分頁池：開 N 個 browser context，各自一個 page，一起消化同一個網址佇列。
+#   - 每個 context 處理 K 頁就關掉重開（Chromium 跑久了記憶體會一直長）
+#   - handle 丟出例外也重開那個 context（page 可能卡在奇怪狀態）
+#   - on_error(item, exc)：開不了 page（new_context 失敗、瀏覽器掛了）或 handle 丟例外時呼叫，
+#     讓呼叫端自己收尾（例如改用 requests 抓）；沒給就只印出錯誤
+#   - setup_context(context)：新 context 建好後要做的設定（例如擋圖片、加 cookie）
+# 另外提供：
+#   - ResourceBlocker：擋掉用不到的資源（圖片 / 影音 / 字型 / 追蹤碼，可選 CSS），setup_context 用
+#   - wait_text_ready()：等內文長度穩定下來，取代固定的 domcontentloaded + 等逾時
+#
+# 用法：
+#   async def handle(page, item): ...            # 處理一筆；丟例外 = 失敗
+#   async def on_error(item, exc): ...          # 選用：這筆沒處理完
+#   stats = await pw_pool.run_pool(browser, items, handle, workers=4, recycle_after=50, on_error=on_error)
+import asyncio
+import traceback
+from collections import Counter
+from urllib.parse import urlparse
+
+from playwright.async_api import TimeoutError as PWTimeoutError
+
+# 常見廣告 / 追蹤 / 統計網域（host 是這些或它們的子網域就擋）
+TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "googlesyndication.com", "doubleclick.net",
+    "googleadservices.com", "adservice.google.com", "facebook.net",
+    "scorecardresearch.com", "hotjar.com", "clarity.ms", "criteo.com", "criteo.net",
+    "taboola.com", "outbrain.com", "amazon-adsystem.com", "adnxs.com",
+)
+# 網址（host + path）含這些字也擋
+TRACKER_PATTERNS = ("/pagead/", "/adsbygoogle", "ad.pixnet", "imp.pixnet")
+
+
+class _Slot:
+    """一個 worker 專用的 context + page，用到 recycle_after 頁就換新"""
+
+    def __init__(self, browser, recycle_after: int, context_kwargs: dict, setup_context):
+        self.browser = browser
+        self.recycle_after = recycle_after
+        self.context_kwargs = context_kwargs or {}
+        self.setup_context = setup_context
+        self.context = None
+        self.page = None
+        self.used = 0
+        self.opened = 0   # 開過幾個 context
+
+    async def get_page(self):
+        if self.page is None or (self.recycle_after and self.used >= self.recycle_after):
+            await self.close()
+            self.context = await self.browser.new_context(**self.context_kwargs)
+            if self.setup_context:
+                await self.setup_context(self.context)
+            self.page = await self.context.new_page()
+            self.used = 0
+            self.opened += 1
+        self.used += 1
+        return self.page
+
+    async def close(self):
+        if self.context is not None:
+            try:
+                await self.context.close()
+            except Exception:
+                pass
+        self.context = None
+        self.page = None
+
+
+async def run_pool(browser, items, handle, workers: int = 4, recycle_after: int = 50,
+                   context_kwargs: dict = None, setup_context=None, on_error=None) -> dict:
+    """items 依序放進佇列，workers 個 page 同時處理；回傳 {"ok": 成功數, "fail": 失敗數, "contexts": 開過幾個 context}
+    每一筆不是交給 handle 處理完，就是交給 on_error（有給的話），不會有漏掉的"""
+    queue = asyncio.Queue()
+    for it in items:
+        queue.put_nowait(it)
+
+    stats = {"ok": 0, "fail": 0, "contexts": 0}
+
+    async def worker(wid: int):
+        slot = _Slot(browser, recycle_after, context_kwargs, setup_context)
+        try:
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    page = await slot.get_page()
+                    await handle(page, item)
+                    stats["ok"] += 1
+                except Exception as e:
+                    stats["fail"] += 1
+                    await slot.close()   # 下一筆用新的 context
+                    if on_error is None:
+                        print(f"[ERR] worker {wid} 未處理的例外：")
+                        traceback.print_exc()
+                        continue
+                    try:
+                        await on_error(item, e)
+                    except Exception:
+                        print(f"[ERR] worker {wid} on_error 失敗：")
+                        traceback.print_exc()
+        finally:
+            await slot.close()
+            stats["contexts"] += slot.opened
+
+    await asyncio.gather(*(worker(i) for i in range(max(1, workers))))
+    return stats
+
+
+# =========================
+# 精簡載入：擋資源
+# =========================
+class ResourceBlocker:
+    """context.route 攔截：resource_type 在 block_types 裡的、或是追蹤網域的，直接 abort。
+    blocked 記錄各類擋了幾個（看效果用）"""
+
+    def __init__(self, block_types=("image", "media", "font"), block_trackers: bool = True):
+        self.block_types = set(block_types)
+        self.block_trackers = block_trackers
+        self.blocked = Counter()
+        self.allowed = 0
+
+    def _is_tracker(self, url: str) -> bool:
+        u = urlparse(url)
+        host = u.hostname or ""
+        if any(host == h or host.endswith("." + h) for h in TRACKER_HOSTS):
+            return True
+        target = (host + u.path).lower()
+        return any(p in target for p in TRACKER_PATTERNS)
+
+    async def _route(self, route):
+        req = route.request
+        kind = req.resource_type
+        if kind != "document" and kind in self.block_types:
+            self.blocked[kind] += 1
+            await route.abort()
+        elif self.block_trackers and kind != "document" and self._is_tracker(req.url):
+            self.blocked["tracker"] += 1
+            await route.abort()
+        else:
+            self.allowed += 1
+            await route.continue_()
+
+    async def setup(self, context):
+        if self.block_types or self.block_trackers:
+            await context.route("**/*", self._route)
+
+    def summary(self) -> str:
+        parts = [f"{k}={v}" for k, v in self.blocked.most_common()]
+        return f"放行 {self.allowed} | 擋掉 {sum(self.blocked.values())}（{', '.join(parts) or '無'}）"
+
+
+# =========================
+# 什麼時候算載入完成
+# =========================
+_TEXT_STABLE_JS = """(stableMs) => {
+    const n = document.body ? document.body.innerText.length : 0;
+    const w = window.__textProbe || (window.__textProbe = {n: -1, t: Date.now()});
+    if (n !== w.n) { w.n = n; w.t = Date.now(); return false; }
+    return n > 0 && Date.now() - w.t >= stableMs;
+}"""
+
+
+async def wait_text_ready(page, stable_ms: int = 500, max_ms: int = 5000, poll_ms: int = 200) -> bool:
+    """DOM 好了之後，等 body.innerText 長度 stable_ms 內都沒變（JS 還在塞內容的網站會等到塞完）；
+    最多等 max_ms，等不到也不算錯，回傳 False 讓呼叫端照樣取內容"""
+    try:
+        await page.wait_for_function(_TEXT_STABLE_JS, arg=stable_ms, polling=poll_ms, timeout=max_ms)
+        return True
+    except PWTimeoutError:
+        return False
@@ -0,0 +1,227 @@
+# 檔名：site_feeds.py
+# 文章總表的快速來源：sitemap.xml / RSS / Atom
+#   - 先找 robots.txt 的 Sitemap:、網頁裡的 <link rel="sitemap"> / <link rel="alternate" type="application/rss+xml">，
+#     都沒有才試常見路徑（/sitemap.xml、/feed ...）
+#   - 邊下載邊解析（lxml iterparse），sitemap index 會往下追，.xml.gz 也吃
+#   - 產生跟 extract_posts 一樣的 {日期, 名稱, 網址}
+#
+# sitemap 通常列出全站網址（完整），但沒有標題、也沒有發文日期（lastmod 是最後修改日）；
+# RSS / Atom 有標題和發文日期，但通常只有最新幾十篇。
+import re
+import zlib
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin, urlparse
+
+import requests
+from lxml import etree
+
+import html_backend
+import http_client
+
+SITEMAP_PATHS = ["/sitemap.xml", "/sitemap_index.xml", "/wp-sitemap.xml"]
+FEED_PATHS = ["/feed", "/rss", "/rss.xml", "/atom.xml", "/feed.xml", "/blog/feed/rss"]
+FEED_TYPES = ("application/rss+xml", "application/atom+xml")
+MAX_INDEX_DEPTH = 3   # sitemap index 最多往下追幾層
+
+
+def _local(tag) -> str:
+    # {namespace}loc → loc
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _child_text(el, name: str) -> str:
+    for c in el.iter():
+        if c is not el and _local(c.tag) == name:
+            return (c.text or "").strip()
+    return ""
+
+
+def to_date10(s: str) -> str:
+    """2024-05-01T10:00:00+08:00 / Wed, 01 May 2024 10:00:00 +0800 → 2024-05-01；看不懂回空字串"""
+    s = (s or "").strip()
+    m = re.match(r"(\d{4})-(\d{2})-(\d{2})", s)
+    if m:
+        return m.group(0)
+    try:
+        return parsedate_to_datetime(s).strftime("%Y-%m-%d")
+    except Exception:
+        return ""
+
+
+# =========================
+# 找 sitemap / feed 網址
+# =========================
+def _site_root(url: str) -> str:
+    u = urlparse(url)
+    return f"{u.scheme}://{u.netloc}"
+
+
+def _links_in_page(soup):
+    if html_backend.is_lxml(soup):
+        return [(" ".join((l.get("rel") or "").split()).lower(), (l.get("type") or "").lower(), l.get("href"))
+                for l in soup.iter("link")]
+    return [(" ".join(l.get("rel") or []).lower(), (l.get("type") or "").lower(), l.get("href"))
+            for l in soup.find_all("link")]
+
+
+def _robots_sitemaps(session: requests.Session, root: str):
+    try:
+        r = http_client.get(session, root + "/robots.txt", timeout=15)
+    except requests.RequestException:
+        return []
+    if r.status_code != 200:
+        return []
+    return [line.split(":", 1)[1].strip() for line in r.text.splitlines()
+            if line.lower().startswith("sitemap:")]
+
+
+def discover(session: requests.Session, start_url: str, soup):
+    """回傳 (sitemap 網址們, feed 網址們, sitemap 是猜的?, feed 是猜的?)；沒宣告的話給常見路徑讓後面試"""
+    root = _site_root(start_url)
+    sitemaps, feeds = list(_robots_sitemaps(session, root)), []
+
+    for rel, typ, href in _links_in_page(soup):
+        if not href:
+            continue
+        if rel == "sitemap":
+            sitemaps.append(urljoin(start_url, href))
+        elif "alternate" in rel and typ in FEED_TYPES:
+            feeds.append(urljoin(start_url, href))
+
+    guess_sitemaps, guess_feeds = not sitemaps, not feeds
+    if guess_sitemaps:
+        sitemaps = [root + p for p in SITEMAP_PATHS]
+    if guess_feeds:
+        feeds = [root + p for p in FEED_PATHS]
+    return list(dict.fromkeys(sitemaps)), list(dict.fromkeys(feeds)), guess_sitemaps, guess_feeds
+
+
+# =========================
+# 串流解析
+# =========================
+def _iter_chunks(session: requests.Session, url: str, chunk_size: int = 64 * 1024):
+    """邊下載邊吐 bytes（不整包讀進記憶體）；.gz 檔自動解壓；不是 200 就什麼都不吐"""
+    try:
+        r = http_client.get(session, url, timeout=30, stream=True)
+    except requests.RequestException:
+        return
+    with r:
+        if r.status_code != 200:
+            return
+        gz = None
+        # iter_content 已經處理伺服器層的 Content-Encoding: gzip；這裡是檔案本身是 .gz
+        for chunk in r.iter_content(chunk_size):
+            if gz is None:
+                gz = zlib.decompressobj(16 + zlib.MAX_WBITS) if chunk[:2] == b"\x1f\x8b" else False
+            yield gz.decompress(chunk) if gz else chunk
+
+
+def _parse_events(session: requests.Session, url: str):
+    parser = etree.XMLPullParser(events=("start", "end"), recover=True, huge_tree=True)
+    for chunk in _iter_chunks(session, url):
+        parser.feed(chunk)
+        yield from parser.read_events()
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        pass
+    yield from parser.read_events()
+
+
+def iter_rows(session: requests.Session, url: str, depth: int = 0, visited: set = None):
+    """依網址內容（urlset / sitemapindex / rss / atom）產生 {日期, 名稱, 網址}"""
+    visited = set() if visited is None else visited
+    if url in visited:
+        return
+    visited.add(url)
+
+    kind = None
+    children = []
+    events = _parse_events(session, url)
+    try:
+        for event, el in events:
+            name = _local(el.tag)
+            if event == "start":
+                if kind is None:
+                    kind = name
+                    if kind not in ("urlset", "sitemapindex", "rss", "feed", "RDF"):
+                        return   # 不是 sitemap / feed（例如 HTML 錯誤頁）
+                continue
+
+            row = None
+            if kind == "sitemapindex" and name == "sitemap":
+                loc = _child_text(el, "loc")
+                if loc:
+                    children.append(loc)
+            elif kind == "urlset" and name == "url":
+                # 有 Google News 擴充就有標題和發文日期；一般 sitemap 只有 lastmod（最後修改日，不是發文日，不拿）
+                row = {
+                    "日期": to_date10(_child_text(el, "publication_date")),
+                    "名稱": _child_text(el, "title"),
+                    "網址": _child_text(el, "loc"),
+                }
+            elif name == "item":
+                row = {
+                    "日期": to_date10(_child_text(el, "pubDate") or _child_text(el, "date")),
+                    "名稱": _child_text(el, "title"),
+                    "網址": _child_text(el, "link"),
+                }
+            elif kind == "feed" and name == "entry":
+                link = next((c.get("href") for c in el if _local(c.tag) == "link"
+                             and c.get("rel", "alternate") == "alternate"), "")
+                row = {
+                    "日期": to_date10(_child_text(el, "published") or _child_text(el, "updated")),
+                    "名稱": _child_text(el, "title"),
+                    "網址": (link or "").strip(),
+                }
+            else:
+                continue
+
+            if row and row["網址"]:
+                yield row
+
+            # 處理完就丟掉，記憶體不會跟著檔案變大
+            el.clear()
+            parent = el.getparent()
+            if parent is not None:
+                while el.getprevious() is not None:
+                    del parent[0]
+    except (etree.XMLSyntaxError, zlib.error):
+        return
+    finally:
+        events.close()
+
+    if depth < MAX_INDEX_DEPTH:
+        for child in children:
+            yield from iter_rows(session, child, depth + 1, visited)
+
+
+# =========================
+# 給總表用
+# =========================
+def _keep(row, start_url: str, url_filter) -> bool:
+    if urlparse(row["網址"]).netloc.lower() != urlparse(start_url).netloc.lower():
+        return False
+    return not url_filter or re.search(url_filter, row["網址"]) is not None
+
+
+def collect(session: requests.Session, start_url: str, soup, url_filter: str = None):
+    """回傳 (sitemap 的列, feed 的列)；同一個網址只留第一筆。url_filter：只留符合的網址（正規式）"""
+    sitemaps, feeds, guess_sitemaps, guess_feeds = discover(session, start_url, soup)
+    visited = set()
+
+    def gather(urls, first_hit_only):
+        # 有宣告的全部讀；猜的路徑讀到一個有東西的就停
+        out = {}
+        for u in urls:
+            n = len(out)
+            for row in iter_rows(session, u, visited=visited):
+                if _keep(row, start_url, url_filter):
+                    out.setdefault(row["網址"], row)
+            if len(out) > n:
+                print(f"[INFO] {u} → {len(out) - n} 筆")
+                if first_hit_only:
+                    break
+        return list(out.values())
+
+    return gather(sitemaps, guess_sitemaps), gather(feeds, guess_feeds)
@@ -0,0 +1,193 @@
+# 檔名：smart_cut.py
+# 影片剪輯共用：關鍵影格索引 + smart cut（剪點精準到影格，速度接近 -c copy）
+#   - 關鍵影格索引、片長、編碼資訊都從 media_probe 拿（ffprobe 結果有快取，同一支影片只掃一次）
+#   - cut_keep_ranges(video, out, keeps, smart=True, loglevel="info")：只留下 keeps 這幾段接起來
+#       * 兩個關鍵影格之間的部分：直接複製封包（-c copy，不重編碼）
+#       * 剪點到下一個關鍵影格之間那一小段 GOP：重編碼（每個剪點最多一個 GOP）
+#       * 全部片段用 concat demuxer 一次接起來，複製的部分直接指向原檔，不產生中間影片檔
+#     smart=False 就整段 -c copy（剪點會對齊到前一個關鍵影格，字幕可能差一點）
+#     重編碼片段的 profile / level / pix_fmt / timebase 跟原片一樣；有一項做不到就自動改成 smart=False
+#
+# 為什麼要這樣：-c copy 只能從關鍵影格開始，-ss 指定的時間會被往前拉到關鍵影格，
+# 影片實際多了幾秒，但字幕是照指定秒數移的 → 對不上。
+import subprocess
+import tempfile
+from pathlib import Path
+
+import media_probe
+
+SMART_CRF = 18             # 重編碼片段的畫質（越小越好、檔越大；18 幾乎看不出差別）
+SMART_PRESET = "veryfast"  # 重編碼速度（片段很短，用快的就好）
+EPS = 0.001                # 剪點跟關鍵影格差不到 1ms 就當作剛好在關鍵影格上
+FFMPEG_LOGLEVEL = "info"   # 最後合併那次 ffmpeg 的訊息量（預設值；批次同時跑好幾個時呼叫端傳 loglevel="error"）
+
+# 原始影片編碼 → 重編碼片段用的編碼器（片段要跟原片同編碼，concat 才接得起來）
+ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+}
+
+# ffprobe 的 profile 名稱 → 編碼器的 -profile:v（不在表裡的 profile 做不出一樣的片段 → 改用 -c copy）
+PROFILES = {
+    "h264": {
+        "Constrained Baseline": "baseline",
+        "Baseline": "baseline",
+        "Main": "main",
+        "High": "high",
+        "High 10": "high10",
+        "High 4:2:2": "high422",
+        "High 4:4:4 Predictive": "high444",
+    },
+    "hevc": {
+        "Main": "main",
+        "Main 10": "main10",
+        "Main Still Picture": "mainstillpicture",
+    },
+}
+
+
+# =========================
+# 規劃片段
+# =========================
+def plan_pieces(keeps, kfs, duration: float):
+    """
+    每個保留段 [a, b] 拆成：
+      ("encode", a, k1)  a 到 a 之後第一個關鍵影格
+      ("copy",   k1, k2) 關鍵影格到關鍵影格
+      ("encode", k2, b)  b 之前最後一個關鍵影格到 b（b 是片尾就直接複製）
+    段內沒有關鍵影格就整段重編碼
+    """
+    pieces = []
+    for a, b in keeps:
+        k1 = next((k for k in kfs if k >= a - EPS), None)
+        k2 = next((k for k in reversed(kfs) if k <= b + EPS), None)
+        to_end = b >= duration - EPS
+
+        if k1 is None or k1 >= b - EPS or (not to_end and k2 <= k1 + EPS):
+            pieces.append(("encode", a, b))
+            continue
+        if k1 > a + EPS:
+            pieces.append(("encode", a, k1))
+        if to_end:
+            pieces.append(("copy", k1, b))
+            continue
+        pieces.append(("copy", k1, k2))
+        if b > k2 + EPS:
+            pieces.append(("encode", k2, b))
+    return pieces
+
+
+# =========================
+# 剪輯
+# =========================
+def _concat_path(p: Path) -> str:
+    # concat 清單裡的路徑用單引號包，檔名本身的 ' 要寫成 '\''
+    return Path(p).resolve().as_posix().replace("'", "'\\''")
+
+
+def fragment_params(vinfo: dict):
+    """
+    重編碼片段要跟原片一樣的 profile / level / pix_fmt / timebase，concat 之後播放器才不會出問題
+    回傳 (ffmpeg 參數, None)；有一項對不上回 (None, 原因)
+    """
+    codec = vinfo.get("codec_name")
+    if codec not in ENCODERS:
+        return None, f"不支援 {codec or '無影像'}"
+    profile = PROFILES[codec].get(vinfo.get("profile"))
+    if profile is None:
+        return None, f"profile {vinfo.get('profile')} 對不上" if vinfo.get("profile") else "profile 不明"
+    level = vinfo.get("level")
+    if not isinstance(level, int) or level <= 0:
+        return None, "level 不明"
+    pix_fmt = vinfo.get("pix_fmt")
+    if not pix_fmt:
+        return None, "pix_fmt 不明"
+    timescale = str(vinfo.get("time_base") or "").partition("/")[2]
+    if not timescale.isdigit():
+        return None, "timebase 不明"
+
+    args = ["-c:v", ENCODERS[codec], "-crf", str(SMART_CRF), "-preset", SMART_PRESET,
+            "-profile:v", profile, "-pix_fmt", pix_fmt]
+    if codec == "h264":
+        # ffprobe 的 h264 level 是 10 倍（40 = 4.0）
+        args += ["-level", f"{level // 10}.{level % 10}"]
+    else:
+        # hevc 是 30 倍（120 = 4.0、93 = 3.1）；libx265 的 level 要從 x265-params 給
+        args += ["-x265-params", f"level-idc={level // 30}.{level % 30 // 3}"]
+    args += ["-video_track_timescale", timescale]
+    return args, None
+
+
+def _encode_fragment(video: Path, out: Path, a: float, b: float, vargs, maps):
+    cmd = [
+        "ffmpeg", "-y", "-v", "error",
+        "-ss", f"{a:.3f}",          # 重編碼時 -ss 是精準到影格的
+        "-i", str(video),
+        "-t", f"{b - a:.3f}",
+        *maps,
+        *vargs,
+        "-c:a", "copy",             # 音訊每個封包都能當起點，直接複製就精準
+        str(out)
+    ]
+    subprocess.run(cmd, check=True)
+
+
+def cut_keep_ranges(video: Path, output_video: Path, keeps, smart: bool = True,
+                    loglevel: str = FFMPEG_LOGLEVEL):
+    """只留下 keeps = [(開始秒, 結束秒), ...]（已排序、不重疊）依序接起來；回傳 [(方式, 開始, 結束)]"""
+    if not keeps:
+        raise ValueError("保留區段是空的，輸出影片長度 <= 0")
+    video = Path(video)
+
+    info = media_probe.probe(video)
+    duration = info["duration"]
+    start = info.get("start_time", 0.0)   # keeps / 關鍵影格都是從檔案開頭算；concat 的 inpoint / outpoint 要原始時間戳
+    streams = info["streams"]
+    vinfo = media_probe.video_stream(info)
+
+    vargs = None
+    if smart:
+        vargs, why = fragment_params(vinfo) if vinfo else (None, "沒有影像")
+        if vargs is None:
+            print(f"[WARN] smart cut：{why}，改用 -c copy（剪點對齊關鍵影格）")
+            smart = False
+
+    if smart:
+        pieces = plan_pieces(keeps, media_probe.keyframes(video), duration)
+    else:
+        pieces = [("copy", a, b) for a, b in keeps]
+
+    # 片段只帶第一個影像 + 所有音訊，順序跟原檔一樣（concat 靠 stream index 對應）
+    maps = []
+    for s in streams:
+        if s is vinfo or s.get("codec_type") == "audio":
+            maps += ["-map", f"0:{s['index']}"]
+
+    src = _concat_path(video)
+    with tempfile.TemporaryDirectory() as td:
+        lines = ["ffconcat version 1.0"]
+        for i, (how, a, b) in enumerate(pieces):
+            if how == "encode":
+                frag = Path(td) / f"frag{i:03d}.mp4"
+                _encode_fragment(video, frag, a, b, vargs, maps)
+                lines.append(f"file '{_concat_path(frag)}'")
+            else:
+                lines.append(f"file '{src}'")
+                lines.append(f"inpoint {a + start:.3f}")
+                lines.append(f"outpoint {b + start:.3f}")
+
+        lst = Path(td) / "list.ffconcat"
+        lst.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        subprocess.run([
+            "ffmpeg", "-y", "-v", loglevel,
+            "-f", "concat",
+            "-safe", "0",
+            "-i", str(lst),
+            "-map", "0:v:0?", "-map", "0:a?",
+            "-c", "copy",
+            "-avoid_negative_ts", "make_zero",
+            "-movflags", "+faststart",
+            str(output_video)
+        ], check=True)
+    return pieces
@@ -1,13 +1,35 @@
-import subprocess
+import os
+import csv
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import re
 import sys
-import tempfile
+
+import media_probe
+import smart_cut
 
 # =========================
 # 固定目錄
 # =========================
 BASE_DIR = Path(r"F:\F\AI\downloads")
+SMART_CUT = True   # True = 剪點精準到影格（剪點附近一小段重編碼，字幕不會差）；False = 全部 -c copy（剪點對齊關鍵影格）
+
+# ===== 批次模式 =====
+BATCH_WORKERS = 0        # 同時剪幾支（0 = 自動：看 CPU 核心數，最多 BATCH_DISK_WORKERS）
+BATCH_DISK_WORKERS = 3   # 同一顆硬碟同時讀寫幾支就飽了（-c copy 幾乎只吃硬碟；SSD 可以開大一點）
+BATCH_FFMPEG_LOGLEVEL = "error"   # 批次好幾支同時跑，ffmpeg 只印錯誤（畫面才不會亂）
+# 用法：python video_cut_mid_with_srt.py --batch 剪輯清單.csv（或 .json） [--force]
+#   --force = 已經有 _cut 輸出的也重剪
+#   清單欄位：file（檔名，可用萬用字元如 *.mp4；相對路徑以清單所在目錄為準）
+#             delete（要刪的區段）/ keep（只留的區段）/ front、back（片頭片尾各剪幾秒）
+#   CSV 例：
+#     file,delete,keep,front,back
+#     *.mp4,,,0:45,1:10
+#     ep07.mp4,"12:00-13:30, 25:10-26:00",,,
+#   JSON 例：[{"file": "ep07.mp4", "delete": "12:00-13:30, 25:10-26:00"}, {"file": "*.mp4", "front": "0:45"}]
 
 # =========================
 # SRT 解析
@@ -41,6 +63,7 @@ def parse_time_input(text: str) -> float:
     """
     支援：
     - mm:ss（例如 1:48）
+    - h:mm:ss（例如 1:02:03，長影片用）
     - 秒數（例如 108 或 108.5）
     - 空白（=0）
     """
@@ -49,12 +72,36 @@ def parse_time_input(text: str) -> float:
         return 0.0
     if ":" in text:
         parts = text.split(":")
-        if len(parts) != 2:
-            raise ValueError("時間格式錯誤，請用 mm:ss")
-        mm, ss = parts
-        return int(mm) * 60 + float(ss)
+        if len(parts) not in (2, 3):
+            raise ValueError("時間格式錯誤，請用 mm:ss 或 h:mm:ss")
+        sec = 0
+        for p in parts[:-1]:
+            sec = (sec + int(p)) * 60
+        return sec + float(parts[-1])
     return float(text)
 
+def parse_ranges(text: str):
+    """
+    多段時間："1:00-1:30, 5:00-5:20; 12:00-12:45" → [(60.0, 90.0), (300.0, 320.0), (720.0, 765.0)]
+    段與段用逗號 / 分號 / 換行分隔，起訖用 - 或 ~ 連接；結束留空 = 到片尾（例如 "58:00-"）
+    """
+    ranges = []
+    for part in re.split(r"[,;，；\n]+", text):
+        part = part.strip()
+        if not part:
+            continue
+        m = re.fullmatch(r"([^-~]*)[-~]([^-~]*)", part)
+        if not m:
+            raise ValueError(f"區段格式錯誤：{part}（請用 開始-結束）")
+        a = parse_time_input(m.group(1))
+        b = parse_time_input(m.group(2)) if m.group(2).strip() else float("inf")
+        if b <= a:
+            raise ValueError(f"區段結束必須大於開始：{part}")
+        ranges.append((a, b))
+    if not ranges:
+        raise ValueError("沒有輸入任何區段")
+    return ranges
+
 def shift_srt_all(input_srt: Path, output_srt: Path, shift_seconds: float):
     shift_ms = int(shift_seconds * 1000)
     text = input_srt.read_text(encoding="utf-8-sig")
@@ -65,111 +112,74 @@ def shift_srt_all(input_srt: Path, output_srt: Path, shift_seconds: float):
 
     output_srt.write_text(TIME_PATTERN.sub(repl, text), encoding="utf-8")
 
-def delete_srt_middle(input_srt: Path, output_srt: Path, a_sec: float, b_sec: float):
-    """
-    刪掉中間 [A, B] 的字幕區段：
-    - 完全落在 [A,B] 的字幕：刪除
-    - A 之前：保留不動
-    - B 之後：整體往前移 (B-A)
-    - 跨界字幕：把落在刪除區的部分裁掉（更合理）
-    """
-    a_ms = int(a_sec * 1000)
-    b_ms = int(b_sec * 1000)
-    if b_ms <= a_ms:
-        raise ValueError("B 必須大於 A")
-
-    shift_ms = b_ms - a_ms
-
+def read_srt_blocks(input_srt: Path):
+    """SRT → [(該段的每一行, 時間行 index, 開始 ms, 結束 ms)]；沒有時間行的段落略過"""
     raw = input_srt.read_text(encoding="utf-8-sig")
     blocks = re.split(r"\r?\n\r?\n", raw.strip(), flags=re.M)
 
-    kept_blocks = []
-
+    out = []
     for blk in blocks:
         lines = blk.splitlines()
         if len(lines) < 2:
             continue
-
-        # 找時間行
-        tl = None
-        m = None
         for i, line in enumerate(lines):
-            mm = SRT_TIME_RANGE.search(line)
-            if mm:
-                tl = i
-                m = mm
+            m = SRT_TIME_RANGE.search(line)
+            if m:
+                out.append((lines, i, srt_time_str_to_ms(m.group("s")), srt_time_str_to_ms(m.group("e"))))
                 break
-        if tl is None:
-            continue
-
-        s_ms = srt_time_str_to_ms(m.group("s"))
-        e_ms = srt_time_str_to_ms(m.group("e"))
-
-        # 情況 1：完全在 A 之前
-        if e_ms <= a_ms:
-            new_s, new_e = s_ms, e_ms
+    return out
 
-        # 情況 2：完全在 B 之後 -> 往前 shift
-        elif s_ms >= b_ms:
-            new_s, new_e = s_ms - shift_ms, e_ms - shift_ms
-
-        # 情況 3：完全落在 [A,B] -> 刪掉
-        elif s_ms >= a_ms and e_ms <= b_ms:
-            continue
+def write_srt_blocks(output_srt: Path, cues):
+    """cues = [(每一行, 時間行 index, 新開始 ms, 新結束 ms)] → 重新編號輸出"""
+    out_lines = []
+    for idx, (lines, tl, s_ms, e_ms) in enumerate(cues, 1):
+        out_lines.append(str(idx))
+        out_lines.append(f"{ms_to_srt_time(s_ms)} --> {ms_to_srt_time(e_ms)}")
+        out_lines.extend(lines[tl + 1:])
+        out_lines.append("")
+    output_srt.write_text("\n".join(out_lines).rstrip() + "\n", encoding="utf-8")
 
-        # 情況 4：跨越 A（s < A < e <= B）-> 裁到 A
-        elif s_ms < a_ms < e_ms <= b_ms:
-            new_s, new_e = s_ms, a_ms
-
-        # 情況 5：跨越 B（A <= s < B < e）-> 裁到 B，並 shift
-        elif a_ms <= s_ms < b_ms < e_ms:
-            new_s, new_e = b_ms - shift_ms, e_ms - shift_ms  # new_s = A
-            # 說明：原本從 s 到 e，其中 s 在刪除區，等於從 B 之後才開始顯示，顯示時間對應到 A
-        # 情況 6：兩邊都跨（s < A 且 e > B）-> 變成兩段？這裡選擇保留 A 前那段
-        elif s_ms < a_ms and e_ms > b_ms:
-            new_s, new_e = s_ms, a_ms
-        else:
+def remap_srt_ranges(input_srt: Path, output_srt: Path, keeps):
+    """
+    依保留區段 keeps = [(開始秒, 結束秒), ...]（已排序、不重疊）一次重算全部字幕：
+    - 每個保留段在新影片裡接在前一段後面，段內的字幕往前移「前面刪掉的總長」
+    - 完全落在刪除區的字幕：刪除
+    - 跨界字幕：落在刪除區的部分裁掉；跨過刪除區的（前後都有保留）接成一條
+    """
+    spans = []   # (原始開始 ms, 原始結束 ms, 新影片裡的開始 ms)
+    pos = 0
+    for a, b in keeps:
+        a_ms = int(a * 1000)
+        b_ms = int(b * 1000) if math.isfinite(b) else sys.maxsize   # 到片尾
+        spans.append((a_ms, b_ms, pos))
+        pos += b_ms - a_ms
+
+    cues = []
+    for lines, tl, s_ms, e_ms in read_srt_blocks(input_srt):
+        hit = [(max(s_ms, a), min(e_ms, b), off - a) for a, b, off in spans if s_ms < b and e_ms > a]
+        if not hit:
             continue
-
+        new_s = hit[0][0] + hit[0][2]
+        new_e = hit[-1][1] + hit[-1][2]
         if new_e <= new_s:
             continue
+        cues.append((lines, tl, new_s, new_e))
 
-        lines[tl] = f"{ms_to_srt_time(new_s)} --> {ms_to_srt_time(new_e)}"
-        kept_blocks.append(lines)
-
-    # 重新編號輸出
-    out_lines = []
-    idx = 1
-    for lines in kept_blocks:
-        tl = None
-        for i, line in enumerate(lines):
-            if SRT_TIME_RANGE.search(line):
-                tl = i
-                break
-        if tl is None:
-            continue
-        text_lines = lines[tl + 1:]
+    write_srt_blocks(output_srt, cues)
 
-        out_lines.append(str(idx))
-        out_lines.append(lines[tl])
-        out_lines.extend(text_lines)
-        out_lines.append("")
-        idx += 1
-
-    output_srt.write_text("\n".join(out_lines).rstrip() + "\n", encoding="utf-8")
+def delete_srt_middle(input_srt: Path, output_srt: Path, a_sec: float, b_sec: float):
+    """刪掉中間 [A, B] 的字幕區段（= 保留 [0,A] + [B,∞) 的 remap_srt_ranges）"""
+    if b_sec <= a_sec:
+        raise ValueError("B 必須大於 A")
+    remap_srt_ranges(input_srt, output_srt, [(0.0, a_sec), (b_sec, float("inf"))])
 
 
 # =========================
 # 影片工具
 # =========================
 def get_duration(video: Path) -> float:
-    cmd = [
-        "ffprobe", "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        str(video)
-    ]
-    return float(subprocess.check_output(cmd).decode().strip())
+    # ffprobe 結果有快取（media_probe），同一支影片不會重複開 ffprobe
+    return media_probe.duration(video)
 
 def cut_video_front_back(input_video: Path, output_video: Path, cut_front: float, cut_back: float):
     duration = get_duration(input_video)
@@ -178,20 +188,65 @@ def cut_video_front_back(input_video: Path, output_video: Path, cut_front: float
     if keep_len <= 0:
         raise ValueError("修剪後影片長度 <= 0，請檢查輸入時間")
 
-    cmd = [
-        "ffmpeg", "-y",
-        "-ss", str(keep_start),
-        "-i", str(input_video),
-        "-t", str(keep_len),
-        "-c", "copy",
-        "-movflags", "+faststart",
-        str(output_video)
-    ]
-    subprocess.run(cmd, check=True)
+    cut_video_keep_ranges(input_video, output_video, [(keep_start, keep_start + keep_len)])
+
+def normalize_ranges(ranges, duration: float):
+    """排序、裁到 [0, 片長]、合併重疊或相連的區段；長度 0 的丟掉"""
+    out = []
+    for a, b in sorted(ranges):
+        a, b = max(0.0, a), min(b, duration)
+        if b <= a:
+            continue
+        if out and a <= out[-1][1]:
+            out[-1] = (out[-1][0], max(out[-1][1], b))
+        else:
+            out.append((a, b))
+    return out
+
+def invert_ranges(ranges, duration: float):
+    """刪除區段 → 保留區段（ranges 要先 normalize_ranges）"""
+    keeps = []
+    pos = 0.0
+    for a, b in ranges:
+        if a > pos:
+            keeps.append((pos, a))
+        pos = b
+    if pos < duration:
+        keeps.append((pos, duration))
+    return keeps
+
+def cut_video_keep_ranges(input_video: Path, output_video: Path, keeps):
+    """
+    只留下 keeps = [(開始秒, 結束秒), ...] 這幾段，依序接起來，一次 ffmpeg 完成
+    SMART_CUT=True：剪點精準到影格（只重編碼剪點附近的 GOP）；False：全部 -c copy
+    """
+    pieces = smart_cut.cut_keep_ranges(input_video, output_video, keeps, smart=SMART_CUT)
+    n_enc = sum(1 for how, _, _ in pieces if how == "encode")
+    if n_enc:
+        print(f"🎯 smart cut：{len(pieces)} 個片段，重編碼 {n_enc} 個（剪點附近）")
+
+def cut_video_edl(input_video: Path, output_video: Path, ranges, mode: str = "delete",
+                  srt: Path = None, output_srt: Path = None):
+    """
+    多段剪輯（EDL）：ranges 是要刪掉（mode="delete"）或要保留（mode="keep"）的區段
+    影片一次 ffmpeg 輸出，有字幕就一起 remap；回傳實際保留的區段
+    """
+    if mode not in ("delete", "keep"):
+        raise ValueError("mode 只能是 delete 或 keep")
+    duration = get_duration(input_video)
+    ranges = normalize_ranges(ranges, duration)
+    keeps = invert_ranges(ranges, duration) if mode == "delete" else ranges
+    if not keeps:
+        raise ValueError("刪除後影片長度 <= 0")
+
+    cut_video_keep_ranges(input_video, output_video, keeps)
+    if srt is not None and srt.exists():
+        remap_srt_ranges(srt, output_srt, keeps)
+    return keeps
 
 def delete_video_middle_concat(input_video: Path, output_video: Path, a_sec: float, b_sec: float):
     """
-    刪掉中間段 [A,B]：輸出 = [0,A] + [B,END]（無重編碼）
+    刪掉中間段 [A,B]：輸出 = [0,A] + [B,END]（無重編碼，一次 ffmpeg）
     """
     duration = get_duration(input_video)
     if a_sec < 0: a_sec = 0
@@ -199,64 +254,150 @@ def delete_video_middle_concat(input_video: Path, output_video: Path, a_sec: flo
         raise ValueError("B 必須大於 A")
     if a_sec >= duration:
         raise ValueError("A 超過影片長度")
-    if b_sec > duration:
-        b_sec = duration
 
-    part1_len = a_sec
-    part2_start = b_sec
-    part2_len = duration - b_sec
+    keeps = invert_ranges(normalize_ranges([(a_sec, b_sec)], duration), duration)
+    cut_video_keep_ranges(input_video, output_video, keeps)
 
-    if part1_len <= 0 and part2_len <= 0:
-        raise ValueError("刪除後影片長度 <= 0")
+# =========================
+# 批次模式
+# =========================
+def load_cut_list(path: Path):
+    """讀剪輯清單 → [{file, delete, keep, front, back}]（值都是字串，空的 = 沒指定）"""
+    if path.suffix.lower() == ".json":
+        rows = json.loads(path.read_text(encoding="utf-8-sig"))
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+
+    out = []
+    for r in rows:
+        r = {k.strip().lower(): v for k, v in r.items() if k}
+        if not str(r.get("file") or "").strip():
+            continue
+        item = {"file": str(r["file"]).strip()}
+        for k in ("delete", "keep", "front", "back"):
+            v = r.get(k)
+            if isinstance(v, list):   # JSON 也可以直接給 [[開始, 結束], ...]（秒）
+                v = ", ".join(f"{a}-{b}" for a, b in v)
+            item[k] = str(v if v is not None else "").strip()
+        out.append(item)
+    return out
+
+def expand_jobs(items, base: Path):
+    """萬用字元展開成一支一支影片；直接寫檔名的列優先於萬用字元，其餘同一支對到多列時以先出現的為準。
+    _cut 輸出檔（含沒剪完的 .part）不算"""
+    def is_glob(item):
+        return any(ch in item["file"] for ch in "*?[")
+
+    jobs = {}
+    for item in sorted(items, key=is_glob):   # sorted 是穩定排序：檔名列在前、原本順序不變
+        p = Path(item["file"])
+        if not p.is_absolute():
+            p = base / p
+        matches = sorted(p.parent.glob(p.name)) if is_glob(item) else [p]
+        for v in matches:
+            if v.stem.endswith(("_cut", "_cut.part")):
+                continue
+            jobs.setdefault(v.resolve(), item)
+    return list(jobs.items())
+
+def job_keeps(item, duration: float):
+    """清單的一列 → 保留區段；keep 跟 delete / front / back 不能同時給"""
+    if item["keep"] and (item["delete"] or item["front"] or item["back"]):
+        raise ValueError("keep 不能跟 delete / front / back 一起用")
+    if item["keep"]:
+        return normalize_ranges(parse_ranges(item["keep"]), duration)
+
+    ranges = parse_ranges(item["delete"]) if item["delete"] else []
+    front, back = parse_time_input(item["front"]), parse_time_input(item["back"])
+    if front > 0:
+        ranges.append((0.0, front))
+    if back > 0:
+        ranges.append((duration - back, duration))
+    if not ranges:
+        raise ValueError("沒有指定任何要剪的區段")
+    return invert_ranges(normalize_ranges(ranges, duration), duration)
+
+def batch_workers() -> int:
+    if BATCH_WORKERS > 0:
+        return BATCH_WORKERS
+    cores = os.cpu_count() or 2
+    # smart cut 要重編碼（x264 自己會開多執行緒），一支大約吃兩個核心；純複製只看硬碟
+    return max(1, min(BATCH_DISK_WORKERS, cores // 2 if SMART_CUT else cores))
+
+def cut_one(video: Path, item, force: bool = False, loglevel: str = smart_cut.FFMPEG_LOGLEVEL):
+    """剪一支；回傳 (狀態, 訊息)。先寫到 _cut.part.mp4，完成才改名（中途中斷不會被當成已完成）"""
+    out_video = video.with_name(video.stem + "_cut.mp4")
+    srt = video.with_suffix(".srt")
+    out_srt = video.with_name(video.stem + "_cut.srt")
+
+    if not video.exists():
+        return "ERR", "找不到檔案"
+    if not force and out_video.exists() and out_video.stat().st_mtime >= video.stat().st_mtime:
+        return "SKIP", f"已有 {out_video.name}"
 
-    with tempfile.TemporaryDirectory() as td:
-        td = Path(td)
-        p1 = td / "part1.mp4"
-        p2 = td / "part2.mp4"
-        lst = td / "list.txt"
-
-        # part1: 0 -> A
-        if part1_len > 0:
-            subprocess.run([
-                "ffmpeg", "-y",
-                "-i", str(input_video),
-                "-t", str(part1_len),
-                "-c", "copy",
-                str(p1)
-            ], check=True)
-
-        # part2: B -> end
-        if part2_len > 0:
-            subprocess.run([
-                "ffmpeg", "-y",
-                "-ss", str(part2_start),
-                "-i", str(input_video),
-                "-c", "copy",
-                str(p2)
-            ], check=True)
-
-        lines = []
-        if part1_len > 0:
-            lines.append(f"file '{p1.as_posix()}'")
-        if part2_len > 0:
-            lines.append(f"file '{p2.as_posix()}'")
-        lst.write_text("\n".join(lines) + "\n", encoding="utf-8")
-
-        # concat
-        subprocess.run([
-            "ffmpeg", "-y",
-            "-f", "concat",
-            "-safe", "0",
-            "-i", str(lst),
-            "-c", "copy",
-            "-movflags", "+faststart",
-            str(output_video)
-        ], check=True)
+    t0 = time.perf_counter()
+    duration = get_duration(video)
+    keeps = job_keeps(item, duration)
+    if not keeps:
+        raise ValueError("剪完影片長度 <= 0")
+
+    part = video.with_name(video.stem + "_cut.part.mp4")
+    try:
+        pieces = smart_cut.cut_keep_ranges(video, part, keeps, smart=SMART_CUT, loglevel=loglevel)
+    except Exception:
+        part.unlink(missing_ok=True)
+        raise
+    os.replace(part, out_video)
+    if srt.exists():
+        remap_srt_ranges(srt, out_srt, keeps)
+
+    sec = time.perf_counter() - t0
+    kept = sum(b - a for a, b in keeps)
+    n_enc = sum(1 for how, _, _ in pieces if how == "encode")
+    return "OK", (f"{sec:.1f}s | 保留 {len(keeps)} 段 {kept:.0f}/{duration:.0f} 秒 | "
+                  f"重編碼片段 {n_enc}{' | 字幕' if srt.exists() else ''}")
+
+def run_batch(list_path: Path, force: bool = False):
+    items = load_cut_list(list_path)
+    jobs = expand_jobs(items, list_path.resolve().parent)
+    workers = batch_workers()
+    print(f"[INFO] 清單 {len(items)} 列 → {len(jobs)} 支影片 | 同時 {workers} 支 | smart cut：{SMART_CUT}")
+    if not jobs:
+        return
+
+    counts = {"OK": 0, "SKIP": 0, "ERR": 0}
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futs = {ex.submit(cut_one, v, item, force, BATCH_FFMPEG_LOGLEVEL): v for v, item in jobs}
+        for i, fut in enumerate(as_completed(futs), 1):
+            v = futs[fut]
+            try:
+                status, msg = fut.result()
+            except Exception as e:
+                status, msg = "ERR", str(e)
+            counts[status] += 1
+            print(f"[{status}] ({i}/{len(jobs)}) {v.name} | {msg}")
+
+    print(f"[DONE] 完成 {counts['OK']} | 略過 {counts['SKIP']} | 失敗 {counts['ERR']} | "
+          f"總共 {time.perf_counter() - t0:.1f}s")
+
+def batch_main():
+    """--batch 清單檔 [--force]"""
+    i = sys.argv.index("--batch")
+    if i + 1 >= len(sys.argv):
+        print("❌ --batch 後面要接剪輯清單（.csv / .json）")
+        sys.exit(1)
+    run_batch(Path(sys.argv[i + 1]), force="--force" in sys.argv)
 
 # =========================
 # 主流程
 # =========================
 def main():
+    if "--batch" in sys.argv:
+        batch_main()
+        return
+
     videos = list(BASE_DIR.glob("*.mp4"))
     if not videos:
         print("❌ 目錄中找不到 MP4")
@@ -272,9 +413,10 @@ def main():
     print("\n模式選擇：")
     print("  1) 前後修剪（各自輸入，預設 0）")
     print("  2) 刪掉中間段（從 A 到 B 不要）  ✅你要這個")
-    mode = input("請輸入 1 或 2（預設 1）：").strip() or "1"
-    if mode not in ("1", "2"):
-        print("❌ 只能輸入 1 或 2")
+    print("  3) 多段剪輯（一次輸入多個區段，刪掉或只保留）")
+    mode = input("請輸入 1、2 或 3（預設 1）：").strip() or "1"
+    if mode not in ("1", "2", "3"):
+        print("❌ 只能輸入 1、2 或 3")
         sys.exit(1)
 
     out_video = video.with_name(video.stem + "_cut.mp4")
@@ -296,6 +438,20 @@ def main():
                     out_srt.write_text(srt.read_text(encoding="utf-8-sig"), encoding="utf-8")
                 print("📝 輸出字幕：", out_srt.name)
 
+        elif mode == "3":  # 多段剪輯
+            print("區段格式：開始-結束，多段用逗號分隔，例如 1:00-1:30, 5:00-5:20, 58:00-（到片尾）")
+            how = input("這些區段要 d) 刪掉 還是 k) 保留？（預設 d）：").strip().lower() or "d"
+            if how not in ("d", "k"):
+                raise ValueError("只能輸入 d 或 k")
+            ranges = parse_ranges(input("請輸入區段："))
+
+            keeps = cut_video_edl(video, out_video, ranges, "delete" if how == "d" else "keep",
+                                  srt=srt, output_srt=out_srt)
+            kept = sum(b - a for a, b in keeps)
+            print(f"✂️ 保留 {len(keeps)} 段，共 {kept:.1f} 秒")
+            if srt.exists():
+                print("📝 輸出字幕：", out_srt.name)
+
         else:  # mode == "2" 刪中間段
             a_in = input("請輸入【開始 A】（mm:ss 或 秒）：")
             b_in = input("請輸入【結束 B】（mm:ss 或 秒）：")
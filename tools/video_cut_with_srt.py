@@ -1,12 +1,15 @@
-import subprocess
 from pathlib import Path
 import re
 import sys
 
+import media_probe
+import smart_cut
+
 # =========================
 # 固定目錄
 # =========================
 BASE_DIR = Path(r"F:\F\AI\downloads")
+SMART_CUT = True   # True = 剪點精準到影格（剪點附近一小段重編碼，字幕不會差）；False = 全部 -c copy（剪點對齊關鍵影格）
 
 # =========================
 # SRT 工具
@@ -67,13 +70,8 @@ def parse_time_input(text: str) -> float:
 # 影片工具
 # =========================
 def get_duration(video):
-    cmd = [
-        "ffprobe", "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        str(video)
-    ]
-    return float(subprocess.check_output(cmd).decode().strip())
+    # ffprobe 結果有快取（media_probe），同一支影片不會重複開 ffprobe
+    return media_probe.duration(video)
 
 def cut_video(input_video, output_video, cut_front, cut_back):
     duration = get_duration(input_video)
@@ -83,22 +81,19 @@ def cut_video(input_video, output_video, cut_front, cut_back):
     if keep_length <= 0:
         raise ValueError("修剪後影片長度 <= 0，請檢查輸入時間")
 
-    cmd = [
-        "ffmpeg", "-y",
-        "-ss", str(keep_start),
-        "-i", str(input_video),
-        "-t", str(keep_length),
-        "-c", "copy",
-        "-movflags", "+faststart",
-        str(output_video)
-    ]
-
-    subprocess.run(cmd, check=True)
+    smart_cut.cut_keep_ranges(input_video, output_video, [(keep_start, keep_start + keep_length)],
+                              smart=SMART_CUT)
 
 # =========================
 # 主流程
 # =========================
 def main():
+    if "--batch" in sys.argv:
+        # 批次模式跟 video_cut_mid_with_srt.py 共用（清單用 front / back 欄位就是這支的前後修剪）
+        import video_cut_mid_with_srt
+        video_cut_mid_with_srt.batch_main()
+        return
+
     videos = list(BASE_DIR.glob("*.mp4"))
     if not videos:
         print("❌ 目錄中找不到 MP4")
@@ -1,36 +1,212 @@
+import os
 import re
+import sys
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
+
+import html_backend
+import http_client
+import inventory_sink
+
+# ===== 批次補日期 =====
+HERE = os.path.dirname(os.path.abspath(__file__))
+INVENTORY_PATH = os.path.join(HERE, "pixnet_posts.json")   # 預設要補的總表（可用參數指定）
+CACHE_DIR = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/.cache"), "blog_tools")   # 快取放使用者目錄，不放在程式旁邊
+DATE_CACHE_PATH = os.path.join(CACHE_DIR, "date_cache.json")   # 網址 → 日期(yyyymmdd) 快取，抓過的不再抓
+DATE_WORKERS = 8        # 同時抓幾篇
+DATE_RATE = 4.0         # 每秒幾個請求（起始值，限速器出錯會自動放慢）
+SAVE_EVERY = 50         # 每抓完幾篇存一次快取（中途中斷不會白抓）
+USE_HTTP_HEADER = True  # 網頁裡找不到日期時，用回應的 Last-Modified（不一定是發文日，最後才用）
+DATE_PROBE_STREAM = True   # True = 邊下載邊解析，看到痞客邦的 li.publish 日期就中斷下載（其他網站照樣整頁讀完）
+DATE_PROBE_CHUNK = 16 * 1024   # 串流每次讀多少 bytes
+# 用法：python 抓日期.py [總表檔（.json / .jsonl / .csv / .xlsx）] [--force]   --force = 已經有日期的也重抓
 
 MONTH_MAP = {
     "jan": "01","feb": "02","mar": "03","apr": "04","may": "05","jun": "06",
     "jul": "07","aug": "08","sep": "09","oct": "10","nov": "11","dec": "12"
 }
 
-def get_pixnet_date8(url: str) -> str:
-    r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=30)
-    r.raise_for_status()
-    r.encoding = r.apparent_encoding or "utf-8"
-    soup = BeautifulSoup(r.text, "lxml")
 
-    y = soup.select_one("li.publish span.year")
-    m = soup.select_one("li.publish span.month")
-    d = soup.select_one("li.publish span.date")
+def _find_span(li, cls: str):
+    return next((s for s in li.iter("span") if cls in (s.get("class") or "").split()), None)
 
-    if not (y and m and d):
-        return ""  # 找不到就回空字串
 
-    year = y.get_text(strip=True)
-    mon_raw = m.get_text(strip=True).lower()
-    day = d.get_text(strip=True)
+def _is_publish_li(el) -> bool:
+    return el.tag == "li" and "publish" in (el.get("class") or "").split()
 
-    mon = MONTH_MAP.get(mon_raw, "")
-    day = re.sub(r"\D", "", day).zfill(2)
+
+def publish_li_date8(li):
+    """一個 li.publish → yyyymmdd；裡面沒有年月日三個 span 回 None，格式不對回空字串"""
+    y, m, d = _find_span(li, "year"), _find_span(li, "month"), _find_span(li, "date")
+    if y is None or m is None or d is None:
+        return None
+
+    year = html_backend.get_text(y)
+    mon = MONTH_MAP.get(html_backend.get_text(m).lower(), "")
+    day = re.sub(r"\D", "", html_backend.get_text(d)).zfill(2)
 
     if not (year.isdigit() and mon and day.isdigit()):
         return ""
-
     return f"{year}{mon}{day}"
 
-# 測試
-print(get_pixnet_date8("https://ey90223.pixnet.net/blog/posts/10353867503"))
+
+def pixnet_date8(root) -> str:
+    """痞客邦的 li.publish span.year / span.month / span.date；找不到回空字串"""
+    for li in root.iter("li"):
+        if not _is_publish_li(li):
+            continue
+        d8 = publish_li_date8(li)
+        if d8 is not None:
+            return d8
+
+    return ""  # 找不到就回空字串
+
+
+def header_date8(resp) -> str:
+    try:
+        return parsedate_to_datetime(resp.headers["Last-Modified"]).strftime("%Y%m%d")
+    except Exception:
+        return ""
+
+
+def fetch_page(url: str, session: requests.Session = None) -> requests.Response:
+    # 沒給 session 就用共用的（連線重複使用、自動限速 + 重試）
+    r = http_client.get(session or http_client.default_session(), url, timeout=30)
+    r.raise_for_status()
+    r.encoding = r.apparent_encoding or "utf-8"
+    return r
+
+
+def get_pixnet_date8(url: str, session: requests.Session = None) -> str:
+    r = fetch_page(url, session)
+    return pixnet_date8(html_backend.parse(r.text))
+
+
+def probe_date8(url: str, session: requests.Session = None):
+    """串流版：邊下載邊餵給 HTMLPullParser，看到痞客邦的 li.publish 日期就中斷連線。
+    li.publish 是第一順位（非串流版也是先看它），所以看到就能停；meta / <time> 都在它前面出現，
+    但排在它後面，要整頁讀完確定沒有 li.publish，再照非串流版的完整規則挑。
+    回傳 (yyyymmdd 或空字串, response, 讀了幾 bytes)"""
+    r = http_client.get(session or http_client.default_session(), url, timeout=30, stream=True)
+    with r:
+        r.raise_for_status()
+        # 標頭沒講 charset 就交給 libxml2 看 <meta charset>（requests 這時會亂填 ISO-8859-1）
+        enc = r.encoding if "charset" in r.headers.get("Content-Type", "").lower() else None
+        parser = etree.HTMLPullParser(events=("end",), encoding=enc)
+        raw = []
+        for chunk in r.iter_content(DATE_PROBE_CHUNK):
+            raw.append(chunk)
+            parser.feed(chunk)
+            for _, el in parser.read_events():
+                if _is_publish_li(el):
+                    d8 = publish_li_date8(el)
+                    if d8:
+                        return d8, r, sum(map(len, raw))   # 離開 with → 連線關掉，剩下的不下載
+
+    body = b"".join(raw)
+    root = parser.close()
+    html = body.decode(enc or "utf-8", errors="replace")
+    return pixnet_date8(root) or html_backend.find_date8(root, html) or "", r, len(body)
+
+
+def resolve_date8(url: str, session: requests.Session = None) -> str:
+    """痞客邦格式 → 一般網頁的 meta / <time> / 內文日期 → HTTP Last-Modified；都沒有回空字串"""
+    if DATE_PROBE_STREAM:
+        d8, r, _ = probe_date8(url, session)
+    else:
+        r = fetch_page(url, session)
+        root = html_backend.parse(r.text)
+        d8 = pixnet_date8(root) or html_backend.find_date8(root, r.text)
+    if not d8 and USE_HTTP_HEADER:
+        d8 = header_date8(r)
+    return d8 or ""
+
+
+# =========================
+# 總表讀寫
+# =========================
+def load_json(path: str, default):
+    if not os.path.isfile(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json_atomic(data, path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def save_rows(rows, path: str):
+    if path.lower().endswith(".json"):
+        save_json_atomic(rows, path)
+        return
+    with inventory_sink.open_sink(path) as sink:
+        sink.write_many(rows)
+
+
+def date8_to_10(d8: str) -> str:
+    # 總表的日期格式跟 extract_posts 一樣：YYYY-MM-DD
+    return f"{d8[:4]}-{d8[4:6]}-{d8[6:8]}"
+
+
+# =========================
+# 批次補日期
+# =========================
+def backfill(path: str, force: bool = False):
+    rows = inventory_sink.read_rows(path)
+    cache = load_json(DATE_CACHE_PATH, {})
+
+    todo = [r["網址"] for r in rows if r.get("網址") and (force or not r.get("日期"))]
+    todo = list(dict.fromkeys(todo))
+    fetch = [u for u in todo if u not in cache]
+    print(f"[INFO] 總表 {len(rows)} 筆 | 缺日期 {len(todo)} | 快取已有 {len(todo) - len(fetch)} | 要抓 {len(fetch)}")
+
+    http_client.configure(per_host_limit=DATE_WORKERS, rate=DATE_RATE, burst=DATE_WORKERS)
+    session = http_client.make_session(pool_maxsize=DATE_WORKERS)
+    ok = miss = fail = 0
+    try:
+        with ThreadPoolExecutor(max_workers=DATE_WORKERS) as ex:
+            futs = {ex.submit(resolve_date8, u, session): u for u in fetch}
+            for i, fut in enumerate(as_completed(futs), 1):
+                u = futs[fut]
+                try:
+                    d8 = fut.result()
+                except Exception as e:
+                    fail += 1
+                    print(f"[ERR] {u} → {e}")
+                    continue
+                if d8:
+                    ok += 1
+                    cache[u] = d8
+                else:
+                    miss += 1
+                    print(f"[WARN] 找不到日期：{u}")
+                if i % SAVE_EVERY == 0:
+                    save_json_atomic(cache, DATE_CACHE_PATH)
+                    print(f"[INFO] {i}/{len(fetch)}")
+    finally:
+        save_json_atomic(cache, DATE_CACHE_PATH)
+        session.close()
+
+    filled = 0
+    for r in rows:
+        d8 = cache.get(r.get("網址"))
+        if d8 and (force or not r.get("日期")):
+            r["日期"] = date8_to_10(d8)
+            filled += 1
+    save_rows(rows, path)
+    print(f"[DONE] 補上 {filled} 筆 | 新抓到 {ok} | 找不到 {miss} | 失敗 {fail}")
+    print(f"[OK]  已寫回：{path}")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    backfill(args[0] if args else INVENTORY_PATH, force="--force" in sys.argv)